@@ -1,2 +1,5 @@
 from .entity import Entity
+from .entity_world import EntityWorld
+from .pointer_dispatcher import PointerDispatcher
+from .render_queue import RenderQueue
 from .scene import Scene
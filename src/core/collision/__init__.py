@@ -1,5 +1,16 @@
 from .collidable import Collidable
 from .collider import Collider, ComplexCollider
-from .collision_detection import CollisionDetector, gjk_algorithm_2d
+from .collision import (
+    Collision,
+    ContinuousCollision,
+    PreCollision,
+    RaycastHit,
+    ShapeCastHit,
+)
+from .collision_detection import (
+    CollisionDetector,
+    batched_gjk_algorithm_2d,
+    gjk_algorithm_2d,
+)
 from .collision_detection.collision_detector import CollisionDetector
 from .collision_manager import CollisionManager2D
@@ -0,0 +1,4 @@
+from .broad_phase import BroadPhase
+from .dynamic_aabb_tree import DynamicAABBTree
+from .spatial_hash_grid import SpatialHashGrid
+from .sweep_and_prune import IncrementalSweepAndPrune, SweepAndPrune
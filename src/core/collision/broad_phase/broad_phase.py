@@ -0,0 +1,112 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from ..collider_store import ColliderStore
+from ..collision_detection import ray_aabb_distances
+
+
+class BroadPhase(ABC):
+    """
+    A broad phase finds the pairs of colliders whose bounding boxes
+    overlap. It reads the bounding boxes from the ColliderStore shared
+    with the CollisionManager2D and reports pairs of handles, smallest
+    handle first. Colliders of the same collidable are never paired, nor
+    pairs rejected by their categories, masks or body types.
+    """
+
+    # Largest number of ray and bounding box pairs tested at once
+    RAYCAST_CHUNK_SIZE = 2**18
+
+    def __init__(self, store: ColliderStore):
+        super().__init__()
+        self.store = store
+
+    @abstractmethod
+    def add(self, handles: list[int]):
+        """Starts tracking new handles"""
+        pass
+
+    @abstractmethod
+    def remove(self, handles: list[int]):
+        """Stops tracking handles, which are no longer in use in the store"""
+        pass
+
+    def refilter(self, handles: list[int]):
+        """Called when the categories, masks or body types of handles change"""
+        pass
+
+    @abstractmethod
+    def update(self):
+        """Called once per frame, after the store refreshed its bounds"""
+        pass
+
+    @abstractmethod
+    def pairs(self) -> set[tuple[int, int]]:
+        pass
+
+    def query(
+        self, min_x: float, min_y: float, max_x: float, max_y: float
+    ) -> list[int]:
+        """
+        Handles whose bounding box overlaps the given box (touching
+        included). By default, every collider is checked.
+        """
+        store = self.store
+        handles = store.live_handles()
+        keep = (
+            (store.min_x[handles] <= max_x)
+            & (min_x <= store.max_x[handles])
+            & (store.min_y[handles] <= max_y)
+            & (min_y <= store.max_y[handles])
+        )
+        return handles[keep].tolist()
+
+    def query_rays(
+        self, origins: np.ndarray, directions: np.ndarray, max_distance: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        For M rays given as M x 2 arrays of origins and unit directions, the
+        pairs (ray, handle) such that the ray enters the bounding box of
+        handle within max_distance, as an array of rays (in increasing
+        order) and an array of handles. By default, every ray is tested
+        against every bounding box, in chunks of rays small enough to keep
+        the arrays of distances under RAYCAST_CHUNK_SIZE.
+        """
+        handles = self.store.live_handles()
+        bounds = self.store.bounds[handles]
+        rays, columns = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        size = max(1, self.RAYCAST_CHUNK_SIZE // max(1, len(handles)))
+        for first in range(0, len(origins), size):
+            distances = ray_aabb_distances(
+                origins[first : first + size],
+                directions[first : first + size],
+                bounds[:, 0:2],
+                bounds[:, 2:4],
+                max_distance,
+            )
+            chunk_rays, chunk_columns = np.nonzero(np.isfinite(distances))
+            rays.append(chunk_rays + first)
+            columns.append(chunk_columns)
+        return np.concatenate(rays), handles[np.concatenate(columns)]
+
+    def _overlapping_pairs(
+        self, handles_1: np.ndarray, handles_2: np.ndarray
+    ) -> set[tuple[int, int]]:
+        """
+        Turns candidate pairs (handles_1[i], handles_2[i]) into the set of
+        distinct pairs whose bounding boxes overlap (touching included)
+        and that belong to different collidables that can collide.
+        """
+        store = self.store
+        first = np.minimum(handles_1, handles_2)
+        second = np.maximum(handles_1, handles_2)
+        keep = (
+            (store.owners[first] != store.owners[second])
+            & store.can_collide(first, second)
+            & (store.min_x[first] <= store.max_x[second])
+            & (store.min_x[second] <= store.max_x[first])
+            & (store.min_y[first] <= store.max_y[second])
+            & (store.min_y[second] <= store.max_y[first])
+        )
+        return set(zip(first[keep].tolist(), second[keep].tolist()))
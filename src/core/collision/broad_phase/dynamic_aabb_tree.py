@@ -0,0 +1,426 @@
+from math import inf
+
+import numpy as np
+
+from ..collider_store import ColliderStore
+from ..collision_detection import ray_aabb_distances
+from .broad_phase import BroadPhase
+
+_NULL = -1
+
+
+class DynamicAABBTree(BroadPhase):
+    """
+    A bounding volume hierarchy whose leaves are the colliders' bounding
+    boxes enlarged by fat_margin on every side and, as in Box2D, stretched
+    by DISPLACEMENT_MULTIPLIER times the last displacement of the collider
+    in the direction it moves. A moving collider is only reinserted in the
+    tree when its box leaves its fat box, so colliders that stand still or
+    jiggle in place cost nothing, and a collider moving at a steady speed
+    is reinserted about once every DISPLACEMENT_MULTIPLIER frames. Longer
+    fat boxes overlap more of the others, which gives more candidate
+    pairs to check against the tight boxes, so fast colliders trade fewer
+    reinsertions for a few more candidates. The tree is kept
+    balanced with rotations, so queries visit O(log n) nodes, and rays only
+    visit the nodes whose box they cross.
+
+    Nodes are stored in parallel lists indexed by node id. Leaves have
+    child_1 == -1 and know the handle they represent.
+    """
+
+    DISPLACEMENT_MULTIPLIER = 4.0
+
+    def __init__(self, store: ColliderStore, fat_margin: float = 4.0):
+        super().__init__(store)
+        self.fat_margin = fat_margin
+        # The top left corner of the bounding box of each handle at the
+        # last update, to know how far it moved since
+        self._previous = np.zeros((0, 2))
+        self.root = _NULL
+        self._min_x: list[float] = []
+        self._min_y: list[float] = []
+        self._max_x: list[float] = []
+        self._max_y: list[float] = []
+        self._parent: list[int] = []
+        self._child_1: list[int] = []
+        self._child_2: list[int] = []
+        self._height: list[int] = []
+        self._node_handle: list[int] = []
+        self._free_nodes: list[int] = []
+        self._handle_leaf: dict[int, int] = {}
+        # Pairs of handles whose fat boxes overlap
+        self._partners: dict[int, set[int]] = {}
+        self._moved: set[int] = set()
+
+    def add(self, handles: list[int]):
+        if len(self._previous) < len(self.store.bounds):
+            previous = np.zeros((len(self.store.bounds), 2))
+            previous[: len(self._previous)] = self._previous
+            self._previous = previous
+        self._previous[handles] = self.store.bounds[handles, 0:2]
+        for handle in handles:
+            leaf = self._allocate_node()
+            self._node_handle[leaf] = handle
+            self._handle_leaf[handle] = leaf
+            self._partners[handle] = set()
+            self._fatten(leaf, handle, 0.0, 0.0)
+            self._insert_leaf(leaf)
+            self._moved.add(handle)
+
+    def remove(self, handles: list[int]):
+        for handle in handles:
+            leaf = self._handle_leaf.pop(handle)
+            self._remove_leaf(leaf)
+            self._free_node(leaf)
+            for partner in self._partners.pop(handle):
+                self._partners[partner].discard(handle)
+            self._moved.discard(handle)
+
+    def update(self):
+        """Reinserts the colliders that left their fat box"""
+        store = self.store
+        min_x, min_y = self._min_x, self._min_y
+        max_x, max_y = self._max_x, self._max_y
+        handles = list(self._handle_leaf)
+        corners = store.bounds[handles, 0:2]
+        displacements = (corners - self._previous[handles]).tolist()
+        self._previous[handles] = corners
+        tight = zip(
+            store.min_x[handles].tolist(),
+            store.min_y[handles].tolist(),
+            store.max_x[handles].tolist(),
+            store.max_y[handles].tolist(),
+        )
+        for handle, (x0, y0, x1, y1), displacement in zip(
+            handles, tight, displacements
+        ):
+            leaf = self._handle_leaf[handle]
+            if min_x[leaf] <= x0 and min_y[leaf] <= y0:
+                if x1 <= max_x[leaf] and y1 <= max_y[leaf]:
+                    continue
+            self._remove_leaf(leaf)
+            self._fatten(leaf, handle, *displacement)
+            self._insert_leaf(leaf)
+            self._moved.add(handle)
+        self._update_partners()
+
+    def pairs(self) -> set[tuple[int, int]]:
+        if self._moved:
+            self._update_partners()  # Colliders were added since update
+        firsts, seconds = [], []
+        for handle, partners in self._partners.items():
+            for partner in partners:
+                if handle < partner:
+                    firsts.append(handle)
+                    seconds.append(partner)
+        return self._overlapping_pairs(
+            np.array(firsts, dtype=np.int64), np.array(seconds, dtype=np.int64)
+        )
+
+    def query(
+        self, min_x: float, min_y: float, max_x: float, max_y: float
+    ) -> list[int]:
+        store = self.store
+        return [
+            handle
+            for handle in self._query_fat(min_x, min_y, max_x, max_y)
+            if store.min_x[handle] <= max_x
+            and min_x <= store.max_x[handle]
+            and store.min_y[handle] <= max_y
+            and min_y <= store.max_y[handle]
+        ]
+
+    def query_rays(
+        self, origins: np.ndarray, directions: np.ndarray, max_distance: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Walks the tree along each ray, then tests the bounding boxes"""
+        rays: list[int] = []
+        handles: list[int] = []
+        for ray, (origin, direction) in enumerate(
+            zip(origins.tolist(), directions.tolist())
+        ):
+            found = self._query_ray_fat(*origin, *direction, max_distance)
+            rays.extend([ray] * len(found))
+            handles.extend(found)
+        ray_array = np.array(rays, dtype=np.int64)
+        handle_array = np.array(handles, dtype=np.int64)
+        # The rays crossing a fat box may still miss the box inside it
+        bounds = self.store.bounds[handle_array][:, None, :]
+        distances = ray_aabb_distances(
+            origins[ray_array],
+            directions[ray_array],
+            bounds[:, :, 0:2],
+            bounds[:, :, 2:4],
+            max_distance,
+        )
+        hit = np.isfinite(distances[:, 0])
+        return ray_array[hit], handle_array[hit]
+
+    def _update_partners(self):
+        """Re-queries the tree for the colliders whose fat box changed"""
+        partners = self._partners
+        min_x, min_y = self._min_x, self._min_y
+        max_x, max_y = self._max_x, self._max_y
+        for handle in self._moved:
+            for partner in partners[handle]:
+                partners[partner].discard(handle)
+            leaf = self._handle_leaf[handle]
+            found = self._query_fat(min_x[leaf], min_y[leaf], max_x[leaf], max_y[leaf])
+            found.remove(handle)
+            partners[handle] = set(found)
+            for partner in found:
+                partners[partner].add(handle)
+        self._moved = set()
+
+    def _query_fat(
+        self, min_x: float, min_y: float, max_x: float, max_y: float
+    ) -> list[int]:
+        """Handles whose fat box overlaps the given box"""
+        found: list[int] = []
+        if self.root == _NULL:
+            return found
+        node_min_x, node_min_y = self._min_x, self._min_y
+        node_max_x, node_max_y = self._max_x, self._max_y
+        child_1, child_2 = self._child_1, self._child_2
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if (
+                node_min_x[node] > max_x
+                or min_x > node_max_x[node]
+                or node_min_y[node] > max_y
+                or min_y > node_max_y[node]
+            ):
+                continue
+            if child_1[node] == _NULL:
+                found.append(self._node_handle[node])
+            else:
+                stack.append(child_1[node])
+                stack.append(child_2[node])
+        return found
+
+    def _query_ray_fat(
+        self, x: float, y: float, dx: float, dy: float, max_distance: float
+    ) -> list[int]:
+        """
+        Handles whose fat box the ray from (x, y) along the unit vector
+        (dx, dy) enters within max_distance, found with the slab test on
+        the box of each node, skipping the subtrees the ray misses.
+        """
+        found: list[int] = []
+        if self.root == _NULL:
+            return found
+        # The sides of the boxes the ray enters and leaves each slab through
+        near_x, far_x = (
+            (self._min_x, self._max_x) if dx >= 0 else (self._max_x, self._min_x)
+        )
+        near_y, far_y = (
+            (self._min_y, self._max_y) if dy >= 0 else (self._max_y, self._min_y)
+        )
+        inv_x = 1 / dx if dx != 0 else inf
+        inv_y = 1 / dy if dy != 0 else inf
+        child_1, child_2 = self._child_1, self._child_2
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            entry, exit = 0.0, max_distance
+            if dx != 0:
+                t = (near_x[node] - x) * inv_x
+                if t > entry:
+                    entry = t
+                t = (far_x[node] - x) * inv_x
+                if t < exit:
+                    exit = t
+            elif x < near_x[node] or x > far_x[node]:
+                continue
+            if dy != 0:
+                t = (near_y[node] - y) * inv_y
+                if t > entry:
+                    entry = t
+                t = (far_y[node] - y) * inv_y
+                if t < exit:
+                    exit = t
+            elif y < near_y[node] or y > far_y[node]:
+                continue
+            if entry > exit:
+                continue
+            if child_1[node] == _NULL:
+                found.append(self._node_handle[node])
+            else:
+                stack.append(child_1[node])
+                stack.append(child_2[node])
+        return found
+
+    def _fatten(self, leaf: int, handle: int, dx: float, dy: float):
+        """Sets the fat box of leaf, stretched along the displacement"""
+        store, margin = self.store, self.fat_margin
+        dx *= self.DISPLACEMENT_MULTIPLIER
+        dy *= self.DISPLACEMENT_MULTIPLIER
+        self._min_x[leaf] = float(store.min_x[handle]) - margin + min(dx, 0.0)
+        self._min_y[leaf] = float(store.min_y[handle]) - margin + min(dy, 0.0)
+        self._max_x[leaf] = float(store.max_x[handle]) + margin + max(dx, 0.0)
+        self._max_y[leaf] = float(store.max_y[handle]) + margin + max(dy, 0.0)
+
+    def _allocate_node(self) -> int:
+        if self._free_nodes:
+            node = self._free_nodes.pop()
+        else:
+            node = len(self._parent)
+            for field in (self._min_x, self._min_y, self._max_x, self._max_y):
+                field.append(0.0)
+            for field in (self._child_1, self._child_2, self._node_handle):
+                field.append(_NULL)
+            self._parent.append(_NULL)
+            self._height.append(0)
+        self._parent[node] = _NULL
+        self._child_1[node] = _NULL
+        self._child_2[node] = _NULL
+        self._node_handle[node] = _NULL
+        self._height[node] = 0
+        return node
+
+    def _free_node(self, node: int):
+        self._height[node] = -1
+        self._free_nodes.append(node)
+
+    def _insert_leaf(self, leaf: int):
+        if self.root == _NULL:
+            self.root = leaf
+            self._parent[leaf] = _NULL
+            return
+        sibling = self._find_best_sibling(leaf)
+        old_parent = self._parent[sibling]
+        new_parent = self._allocate_node()
+        self._parent[new_parent] = old_parent
+        self._child_1[new_parent] = sibling
+        self._child_2[new_parent] = leaf
+        self._parent[sibling] = new_parent
+        self._parent[leaf] = new_parent
+        if old_parent == _NULL:
+            self.root = new_parent
+        elif self._child_1[old_parent] == sibling:
+            self._child_1[old_parent] = new_parent
+        else:
+            self._child_2[old_parent] = new_parent
+        self._refit_ancestors(new_parent)
+
+    def _find_best_sibling(self, leaf: int) -> int:
+        """
+        Descends from the root choosing, at each node, the cheapest place to
+        attach leaf, measured by the increase in perimeter of the boxes.
+        """
+        min_x, min_y = self._min_x, self._min_y
+        max_x, max_y = self._max_x, self._max_y
+        x0, y0, x1, y1 = min_x[leaf], min_y[leaf], max_x[leaf], max_y[leaf]
+        node = self.root
+        while self._child_1[node] != _NULL:
+            perimeter = max_x[node] - min_x[node] + max_y[node] - min_y[node]
+            combined = (
+                max(x1, max_x[node])
+                - min(x0, min_x[node])
+                + max(y1, max_y[node])
+                - min(y0, min_y[node])
+            )
+            cost = 2 * combined
+            inheritance_cost = 2 * (combined - perimeter)
+            child_costs = []
+            for child in (self._child_1[node], self._child_2[node]):
+                enlarged = (
+                    max(x1, max_x[child])
+                    - min(x0, min_x[child])
+                    + max(y1, max_y[child])
+                    - min(y0, min_y[child])
+                )
+                if self._child_1[child] != _NULL:
+                    enlarged -= (
+                        max_x[child] - min_x[child] + max_y[child] - min_y[child]
+                    )
+                child_costs.append(enlarged + inheritance_cost)
+            if cost < min(child_costs):
+                break
+            node = (
+                self._child_1[node]
+                if child_costs[0] <= child_costs[1]
+                else self._child_2[node]
+            )
+        return node
+
+    def _remove_leaf(self, leaf: int):
+        if leaf == self.root:
+            self.root = _NULL
+            return
+        parent = self._parent[leaf]
+        grandparent = self._parent[parent]
+        sibling = (
+            self._child_2[parent]
+            if self._child_1[parent] == leaf
+            else self._child_1[parent]
+        )
+        if grandparent == _NULL:
+            self.root = sibling
+            self._parent[sibling] = _NULL
+        else:
+            if self._child_1[grandparent] == parent:
+                self._child_1[grandparent] = sibling
+            else:
+                self._child_2[grandparent] = sibling
+            self._parent[sibling] = grandparent
+            self._refit_ancestors(grandparent)
+        self._free_node(parent)
+        self._parent[leaf] = _NULL
+
+    def _refit_ancestors(self, node: int):
+        while node != _NULL:
+            node = self._balance(node)
+            child_1, child_2 = self._child_1[node], self._child_2[node]
+            self._height[node] = 1 + max(self._height[child_1], self._height[child_2])
+            self._fit(node, child_1, child_2)
+            node = self._parent[node]
+
+    def _fit(self, node: int, child_1: int, child_2: int):
+        self._min_x[node] = min(self._min_x[child_1], self._min_x[child_2])
+        self._min_y[node] = min(self._min_y[child_1], self._min_y[child_2])
+        self._max_x[node] = max(self._max_x[child_1], self._max_x[child_2])
+        self._max_y[node] = max(self._max_y[child_1], self._max_y[child_2])
+
+    def _balance(self, a: int) -> int:
+        """
+        If the subtree rooted at a is unbalanced, promotes its taller child
+        and returns the new root of the subtree. Otherwise returns a.
+        """
+        if self._child_1[a] == _NULL or self._height[a] < 2:
+            return a
+        b, c = self._child_1[a], self._child_2[a]
+        balance = self._height[c] - self._height[b]
+        if balance > 1:
+            return self._rotate(a, c, b)
+        if balance < -1:
+            return self._rotate(a, b, c)
+        return a
+
+    def _rotate(self, a: int, tall: int, short: int) -> int:
+        """Promotes the child tall of a, which takes the place of a"""
+        child_1, child_2 = self._child_1, self._child_2
+        height, parent = self._height, self._parent
+        f, g = child_1[tall], child_2[tall]
+        child_1[tall] = a
+        parent[tall] = parent[a]
+        parent[a] = tall
+        grandparent = parent[tall]
+        if grandparent == _NULL:
+            self.root = tall
+        elif child_1[grandparent] == a:
+            child_1[grandparent] = tall
+        else:
+            child_2[grandparent] = tall
+        # The taller grandchild stays under tall, the other one goes to a
+        if height[f] < height[g]:
+            f, g = g, f
+        child_2[tall] = f
+        child_1[a], child_2[a] = short, g
+        parent[g] = a
+        self._fit(a, short, g)
+        height[a] = 1 + max(height[short], height[g])
+        self._fit(tall, a, f)
+        height[tall] = 1 + max(height[a], height[f])
+        return tall
@@ -0,0 +1,72 @@
+import numpy as np
+
+from ..collider_store import ColliderStore
+from .broad_phase import BroadPhase
+
+
+class SpatialHashGrid(BroadPhase):
+    """
+    Splits the plane in square cells of side cell_size and hashes every
+    collider into the cells its bounding box touches. Only colliders that
+    share a cell are paired. Unlike sweep-and-prune, this does not degrade
+    when many objects line up on one axis, and the cost grows close to
+    linearly when objects are small compared to cell_size and evenly spread.
+    """
+
+    def __init__(self, store: ColliderStore, cell_size: int = 32):
+        super().__init__(store)
+        assert cell_size > 0
+        self.cell_size = cell_size
+        self._cell_keys = np.empty(0, dtype=np.int64)
+        self._cell_handles = np.empty(0, dtype=np.int64)
+        self._outdated = False
+
+    def add(self, handles: list[int]):
+        self._outdated = True
+
+    def remove(self, handles: list[int]):
+        self._outdated = True
+
+    def update(self):
+        """
+        Lists one (cell, handle) entry per cell touched by each live
+        collider, sorted by cell.
+        """
+        store = self.store
+        handles = store.live_handles()
+        cell_size = self.cell_size
+        first_x = np.floor_divide(store.min_x[handles], cell_size).astype(np.int64)
+        first_y = np.floor_divide(store.min_y[handles], cell_size).astype(np.int64)
+        last_x = np.floor_divide(store.max_x[handles], cell_size).astype(np.int64)
+        last_y = np.floor_divide(store.max_y[handles], cell_size).astype(np.int64)
+        n_rows = last_y - first_y + 1
+        n_cells = (last_x - first_x + 1) * n_rows
+        entry_handles = np.repeat(np.arange(len(handles)), n_cells)
+        offsets = np.cumsum(n_cells) - n_cells
+        local = np.arange(len(entry_handles)) - offsets[entry_handles]
+        cell_x = first_x[entry_handles] + local // n_rows[entry_handles]
+        cell_y = first_y[entry_handles] + local % n_rows[entry_handles]
+        keys = (cell_x << 32) + cell_y
+        order = np.argsort(keys, kind="stable")
+        self._cell_keys = keys[order]
+        self._cell_handles = handles[entry_handles[order]]
+        self._outdated = False
+
+    def pairs(self) -> set[tuple[int, int]]:
+        """Pairs every entry with the entries after it in the same cell"""
+        if self._outdated:
+            self.update()  # Colliders were added or removed since update
+        keys = self._cell_keys
+        n = len(keys)
+        if n < 2:
+            return set()
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], n]
+        cell_end = np.repeat(ends, ends - starts)
+        partners = cell_end - np.arange(n) - 1
+        firsts = np.repeat(np.arange(n), partners)
+        offsets = np.cumsum(partners) - partners
+        seconds = firsts + 1 + np.arange(len(firsts)) - offsets[firsts]
+        return self._overlapping_pairs(
+            self._cell_handles[firsts], self._cell_handles[seconds]
+        )
@@ -0,0 +1,419 @@
+from typing import Literal
+
+import numpy as np
+
+from ...utils import BodyType, FrameProfiler, insertion_sort
+from ..collider_store import ColliderStore
+from .broad_phase import BroadPhase
+
+
+class SweepAndPrune(BroadPhase):
+    """
+    Each collider has two endpoints per axis, encoded as 2 * handle
+    (initial) and 2 * handle + 1 (final). x_sorted and y_sorted keep those
+    endpoints sorted by their position on the axis; both are swept every
+    frame. The endpoints of static colliders are sorted only when static
+    colliders are added or removed, and merged every frame with the other
+    endpoints, which are sorted from scratch.
+    """
+
+    def __init__(self, store: ColliderStore):
+        super().__init__(store)
+        self.x_sorted: list[int] = []
+        self.y_sorted: list[int] = []
+        self._handles_to_remove: set[int] = set()
+        self._moving = np.empty(0, dtype=np.int64)
+        self._static_x = np.empty(0, dtype=np.int64)
+        self._static_y = np.empty(0, dtype=np.int64)
+        self._split_version: int | None = None
+
+    def add(self, handles: list[int]):
+        """Merges the endpoints of the new handles into both sorted axes"""
+        if self._handles_to_remove:
+            # The store gives removed handles again
+            self._drop_removed_endpoints()
+        endpoints = np.array(
+            [2 * h + is_final for h in handles for is_final in (0, 1)], dtype=np.int64
+        )
+        store = self.store
+        self.x_sorted = self._merged_endpoints(
+            endpoints, np.array(self.x_sorted, dtype=np.int64), store.min_x, store.max_x
+        )
+        self.y_sorted = self._merged_endpoints(
+            endpoints, np.array(self.y_sorted, dtype=np.int64), store.min_y, store.max_y
+        )
+        self._split_version = None
+
+    def remove(self, handles: list[int]):
+        self._handles_to_remove.update(handles)
+
+    def update(self):
+        if self._handles_to_remove:
+            self._drop_removed_endpoints()
+        if self._split_version != self.store.static_version:
+            self._split_static_endpoints()
+        profiler = FrameProfiler()
+        with profiler.scope("collision.sort_x"):
+            self.sort_on_x()
+        with profiler.scope("collision.sort_y"):
+            self.sort_on_y()
+
+    def pairs(self) -> set[tuple[int, int]]:
+        profiler = FrameProfiler()
+        with profiler.scope("collision.sweep_x"):
+            colliding_in_x = self.broad_phase_in_axis("x")
+        with profiler.scope("collision.sweep_y"):
+            colliding_in_y = self.broad_phase_in_axis("y")
+        return colliding_in_x.intersection(colliding_in_y)
+
+    def broad_phase_in_axis(self, axis: Literal["x", "y"]) -> set[tuple[int, int]]:
+        """
+        Implements the sweep-and-prune algorithm for one axis. Returns
+        the pairs of handles (smallest first) overlapping in that axis.
+        """
+        if self._handles_to_remove:
+            self._drop_removed_endpoints()
+        endpoints = self.x_sorted if axis == "x" else self.y_sorted
+        store = self.store
+        handle_objs = store.objs
+        n = len(store)
+        categories, masks = store.categories[:n].tolist(), store.masks[:n].tolist()
+        dynamic = (store.body_types[:n] == BodyType.DYNAMIC.value).tolist()
+        pairs: set[tuple[int, int]] = set()
+        # Colliders that are not dynamic are only paired with dynamic ones
+        touching_dynamic: set[int] = set()
+        touching_others: set[int] = set()
+        for endpoint in endpoints:
+            handle_1 = endpoint >> 1
+            is_dynamic = dynamic[handle_1]
+            touching = touching_dynamic if is_dynamic else touching_others
+            if endpoint & 1:
+                touching.remove(handle_1)
+                continue
+            obj_1 = handle_objs[handle_1]
+            category_1, mask_1 = categories[handle_1], masks[handle_1]
+            for group in (touching_dynamic, touching_others)[: 1 + is_dynamic]:
+                for handle_2 in group:
+                    if obj_1 is handle_objs[handle_2]:
+                        continue
+                    if not (
+                        category_1 & masks[handle_2] and categories[handle_2] & mask_1
+                    ):
+                        continue
+                    pairs.add(
+                        (handle_1, handle_2)
+                        if handle_1 < handle_2
+                        else (handle_2, handle_1)
+                    )
+            touching.add(handle_1)
+        return pairs
+
+    def sort_on_x(self):
+        store = self.store
+        self.x_sorted = self._merged_endpoints(
+            self._moving, self._static_x, store.min_x, store.max_x
+        )
+
+    def sort_on_y(self):
+        store = self.store
+        self.y_sorted = self._merged_endpoints(
+            self._moving, self._static_y, store.min_y, store.max_y
+        )
+
+    def _split_static_endpoints(self):
+        """Separates and sorts the endpoints of static colliders"""
+        store = self.store
+        endpoints = np.array(self.x_sorted, dtype=np.int64)
+        static = store.body_types[endpoints >> 1] == BodyType.STATIC.value
+        self._moving = endpoints[~static]
+        static_endpoints = endpoints[static].tolist()
+        self._static_x = np.array(
+            self._sorted_endpoints(static_endpoints, store.min_x, store.max_x),
+            dtype=np.int64,
+        )
+        self._static_y = np.array(
+            self._sorted_endpoints(static_endpoints, store.min_y, store.max_y),
+            dtype=np.int64,
+        )
+        self._split_version = store.static_version
+
+    @staticmethod
+    def _merged_endpoints(
+        moving: np.ndarray, static: np.ndarray, mins: np.ndarray, maxs: np.ndarray
+    ) -> list[int]:
+        """
+        Sorts the moving endpoints and merges them with the sorted static
+        ones. Initial moving endpoints go before static endpoints of the
+        same value and final ones after, so ties are kept as in
+        _sorted_endpoints. add also uses it to merge new endpoints with
+        the ones already sorted.
+        """
+        moving = np.array(
+            SweepAndPrune._sorted_endpoints(moving.tolist(), mins, maxs),
+            dtype=np.int64,
+        )
+        if len(static) == 0:
+            return moving.tolist()
+        static_values = np.where(static & 1, maxs[static >> 1], mins[static >> 1])
+        is_final = moving & 1
+        values = np.where(is_final, maxs[moving >> 1], mins[moving >> 1])
+        left = np.searchsorted(static_values, values, side="left")
+        right = np.searchsorted(static_values, values, side="right")
+        positions = np.where(is_final, right, left) + np.arange(len(moving))
+        merged = np.empty(len(moving) + len(static), dtype=np.int64)
+        is_moving = np.zeros(len(merged), dtype=bool)
+        is_moving[positions] = True
+        merged[positions] = moving
+        merged[~is_moving] = static
+        return merged.tolist()
+
+    @staticmethod
+    def _sorted_endpoints(
+        endpoints: list[int], mins: np.ndarray, maxs: np.ndarray
+    ) -> list[int]:
+        """
+        Sorts the endpoints by their value. On ties, initial endpoints
+        come first, so colliders that are only touching still overlap.
+        """
+        array = np.array(endpoints, dtype=np.int64)
+        handles, is_final = array >> 1, array & 1
+        values = np.where(is_final, maxs[handles], mins[handles])
+        return array[np.lexsort((is_final, values))].tolist()
+
+    def _drop_removed_endpoints(self):
+        removed = self._handles_to_remove
+        self.x_sorted = [e for e in self.x_sorted if e >> 1 not in removed]
+        self.y_sorted = [e for e in self.y_sorted if e >> 1 not in removed]
+        self._handles_to_remove = set()
+        self._split_version = None
+
+
+class IncrementalSweepAndPrune(SweepAndPrune):
+    """
+    Keeps the endpoints sorted with insertion_sort and updates a persistent
+    set of overlapping pairs only when two endpoints swap, which is cheap
+    when objects move little between frames.
+
+    Only the endpoints of colliders that are not static are kept in
+    x_sorted and y_sorted. The endpoints of static colliders are sorted
+    apart, as in SweepAndPrune, and the static endpoints a moving endpoint
+    went past since the last update are found with a binary search, from
+    where it was then and where it is now, so they are swapped without
+    going through insertion_sort. When a collider becomes static or stops
+    being static, the pairs are found again with a full sweep.
+    """
+
+    def __init__(self, store: ColliderStore):
+        super().__init__(store)
+        self._pairs: set[tuple[int, int]] = set()
+        self._bounds: tuple[list[float], ...] = ([], [], [], [])
+        self._filters: tuple[list[int], list[int], list[bool]] = ([], [], [])
+        # The bounding boxes at the last update, to know where the moving
+        # endpoints were, and the positions of the sorted static endpoints
+        self._previous = np.empty((0, 4))
+        self._static_values = (np.empty(0), np.empty(0))
+
+    def update(self):
+        if self._handles_to_remove:
+            self._drop_removed_endpoints()
+        store = self.store
+        if self._split_version != store.static_version:
+            self._split_static_endpoints()
+        n = len(store)
+        self._bounds = tuple(
+            array[:n].tolist()
+            for array in (store.min_x, store.max_x, store.min_y, store.max_y)
+        )
+        profiler = FrameProfiler()
+        with profiler.scope("collision.sort_x"):
+            self.sort_on_x()
+        with profiler.scope("collision.sort_y"):
+            self.sort_on_y()
+        self._previous = store.bounds[:n].copy()
+
+    def add(self, handles: list[int]):
+        """
+        The new endpoints are merged at their place, so no swap reports
+        their pairs, which are found with a query instead.
+        """
+        split_version = self._split_version
+        super().add(handles)
+        # New static endpoints change static_version, which splits them
+        self._split_version = split_version
+        n = len(self.store)
+        previous = np.empty((n, 4))
+        previous[: len(self._previous)] = self._previous
+        previous[handles] = self.store.bounds[handles]
+        self._previous = previous
+        self.refilter(handles)
+
+    def pairs(self) -> set[tuple[int, int]]:
+        if self._handles_to_remove:
+            self._drop_removed_endpoints()
+        return self._pairs
+
+    def refilter(self, handles: list[int]):
+        """Recomputes the persistent pairs of handles from scratch"""
+        changed = set(handles)
+        self._pairs = {
+            pair
+            for pair in self._pairs
+            if pair[0] not in changed and pair[1] not in changed
+        }
+        store = self.store
+        n = len(store)
+        self._filters = (
+            store.categories[:n].tolist(),
+            store.masks[:n].tolist(),
+            (store.body_types[:n] == BodyType.DYNAMIC.value).tolist(),
+        )
+        for handle in handles:
+            others = np.array(
+                self.query(
+                    store.min_x[handle],
+                    store.min_y[handle],
+                    store.max_x[handle],
+                    store.max_y[handle],
+                ),
+                dtype=np.int64,
+            )
+            mine = np.full(len(others), handle, dtype=np.int64)
+            self._pairs |= self._overlapping_pairs(mine, others)
+
+    def sort_on_x(self):
+        min_x, max_x, _, _ = self._bounds
+        self._sort_incrementally(self.x_sorted, min_x, max_x)
+        self._swap_static(self.x_sorted, self._static_x, self._static_values[0], 0)
+
+    def sort_on_y(self):
+        _, _, min_y, max_y = self._bounds
+        self._sort_incrementally(self.y_sorted, min_y, max_y)
+        self._swap_static(self.y_sorted, self._static_y, self._static_values[1], 1)
+
+    def _split_static_endpoints(self):
+        """
+        Moves the static endpoints out of x_sorted and y_sorted, and finds
+        the pairs again with a sweep of all the endpoints.
+        """
+        store = self.store
+        endpoints = self.x_sorted + self._static_x.tolist()
+        self.x_sorted = self._sorted_endpoints(endpoints, store.min_x, store.max_x)
+        self.y_sorted = self._sorted_endpoints(endpoints, store.min_y, store.max_y)
+        self._pairs = super().pairs()
+        super()._split_static_endpoints()
+        static = (store.body_types == BodyType.STATIC.value).tolist()
+        self.x_sorted = [e for e in self.x_sorted if not static[e >> 1]]
+        self.y_sorted = [e for e in self.y_sorted if not static[e >> 1]]
+        self._static_values = tuple(
+            np.where(ends & 1, maxs[ends >> 1], mins[ends >> 1])
+            for ends, mins, maxs in (
+                (self._static_x, store.min_x, store.max_x),
+                (self._static_y, store.min_y, store.max_y),
+            )
+        )
+        self._previous = store.bounds[: len(store)].copy()
+
+    def _swap_static(
+        self,
+        endpoints: list[int],
+        static: np.ndarray,
+        static_values: np.ndarray,
+        axis: int,
+    ):
+        """
+        Calls _on_swap for each static endpoint that one of the (moving)
+        endpoints went past on an axis (0 for x, 1 for y) since the last
+        update. Initial endpoints go before static endpoints of the same
+        value and final ones after, as in _merged_endpoints.
+        """
+        if len(static) == 0 or not endpoints:
+            return
+        array = np.array(endpoints, dtype=np.int64)
+        handles, is_final = array >> 1, (array & 1).astype(bool)
+        columns = axis + 2 * is_final
+        before = self._static_index(
+            static_values, self._previous[handles, columns], is_final
+        )
+        after = self._static_index(
+            static_values, self.store.bounds[handles, columns], is_final
+        )
+        static_list = static.tolist()
+        for i in np.flatnonzero(before != after).tolist():
+            endpoint, start, end = endpoints[i], int(before[i]), int(after[i])
+            if end < start:
+                for other in static_list[end:start]:
+                    self._on_swap(endpoint, other)
+            else:
+                for other in static_list[start:end]:
+                    self._on_swap(other, endpoint)
+
+    @staticmethod
+    def _static_index(
+        static_values: np.ndarray, values: np.ndarray, is_final: np.ndarray
+    ) -> np.ndarray:
+        """Where endpoints with values go among the sorted static ones"""
+        return np.where(
+            is_final,
+            np.searchsorted(static_values, values, side="right"),
+            np.searchsorted(static_values, values, side="left"),
+        )
+
+    def _sort_incrementally(
+        self, endpoints: list[int], mins: list[float], maxs: list[float]
+    ):
+        """
+        Re-sorts the endpoints of one axis with insertion_sort. Whenever an
+        initial endpoint moves past a final one, their colliders may have
+        started overlapping, and whenever a final endpoint moves past an
+        initial one, they stopped overlapping.
+        """
+
+        def size(endpoint: int) -> tuple[float, int]:
+            is_final = endpoint & 1
+            handle = endpoint >> 1
+            return (maxs[handle] if is_final else mins[handle], is_final)
+
+        insertion_sort(endpoints, size=size, on_swap=self._on_swap)
+
+    def _on_swap(self, endpoint_1: int, endpoint_2: int):
+        is_final_1, is_final_2 = endpoint_1 & 1, endpoint_2 & 1
+        if is_final_1 == is_final_2:
+            return
+        handle_1, handle_2 = endpoint_1 >> 1, endpoint_2 >> 1
+        pair = (handle_1, handle_2) if handle_1 < handle_2 else (handle_2, handle_1)
+        if is_final_1:
+            self._pairs.discard(pair)
+            return
+        if self.store.objs[handle_1] is self.store.objs[handle_2]:
+            return
+        categories, masks, dynamic = self._filters
+        if not (dynamic[handle_1] or dynamic[handle_2]):
+            return
+        if not (categories[handle_1] & masks[handle_2]):
+            return
+        if not (categories[handle_2] & masks[handle_1]):
+            return
+        min_x, max_x, min_y, max_y = self._bounds
+        if (
+            min_x[handle_1] <= max_x[handle_2]
+            and min_x[handle_2] <= max_x[handle_1]
+            and min_y[handle_1] <= max_y[handle_2]
+            and min_y[handle_2] <= max_y[handle_1]
+        ):
+            self._pairs.add(pair)
+
+    def _drop_removed_endpoints(self):
+        removed = self._handles_to_remove
+        self._pairs = {
+            pair
+            for pair in self._pairs
+            if pair[0] not in removed and pair[1] not in removed
+        }
+        removed_handles = np.array(list(removed), dtype=np.int64)
+        for name in ("_static_x", "_static_y"):
+            endpoints = getattr(self, name)
+            setattr(self, name, endpoints[~np.isin(endpoints >> 1, removed_handles)])
+        split_version = self._split_version
+        super()._drop_removed_endpoints()
+        # Removing static endpoints changes static_version, which splits them
+        self._split_version = split_version
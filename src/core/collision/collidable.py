@@ -1,12 +1,44 @@
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
 
+from ..utils import BodyType
 from .collider import Collider
 
+if TYPE_CHECKING:
+    from .collision import Collision
+
+
+ALL_CATEGORIES = -1
+
 
 class Collidable(ABC):
     def __init__(self):
         super().__init__()
+        # Sweeps the colliders from their last position, so they cannot
+        # tunnel through thin colliders (see CollisionManager2D)
+        self.continuous_collision = False
+        # Two collidables only collide if the category of each one has a
+        # bit in common with the mask of the other, and one is dynamic
+        self.body_type = BodyType.DYNAMIC
+        self.collision_category = 1
+        self.collision_mask = ALL_CATEGORIES
 
     @abstractmethod
     def get_colliders(self) -> set[Collider]:
         pass
+
+    def sync_transform(self):
+        """Called by CollisionManager2D before it reads the colliders"""
+        pass
+
+    def on_collision_begin(self, collision: "Collision"):
+        """Called by CollisionManager2D.get_collision_events"""
+        pass
+
+    def on_collision_stay(self, collision: "Collision"):
+        """Called by CollisionManager2D.get_collision_events"""
+        pass
+
+    def on_collision_end(self, collision: "Collision"):
+        """Called by CollisionManager2D.get_collision_events"""
+        pass
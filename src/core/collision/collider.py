@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 from ..utils import Pos, Rect
 
 
@@ -35,6 +37,15 @@ class Collider:
             return False
         return self._point_collision(point)
 
+    def points_collision(self, points: np.ndarray) -> np.ndarray:
+        """
+        point_collision for an M x 2 array of points, returning a boolean
+        array of size M. Subclasses may vectorize it.
+        """
+        return np.array(
+            [self.point_collision(Pos(x, y)) for x, y in points.tolist()], dtype=bool
+        )
+
     @abstractmethod
     def _move(self, translation_vector: Pos):
         """Translates itself by translation_vector"""
@@ -0,0 +1,237 @@
+import numpy as np
+
+from ..utils import BodyType, Rect, RectArray
+from .collidable import Collidable
+from .collider import Collider
+from .colliders import PolygonCollider
+
+
+class ColliderStore:
+    """
+    Struct-of-arrays storage for the colliders registered in a
+    CollisionManager2D. Every collider gets an integer handle that indexes
+    the rows of bounds (its bounding box, as left, top, right and bottom)
+    and owners (an id of the collidable it belongs to, or -1 if the handle
+    is not in use). min_x, min_y, max_x and max_y are views of the columns
+    of bounds, and rects is a RectArray view of it. Removed handles go to a
+    free list and are given again to the next colliders added.
+
+    Each handle also has the category and mask bits of its collidable, and
+    whether it is dynamic. static_version changes whenever a static handle
+    is added or removed, so the broad phase can cache what it knows about
+    static handles. In the same way, handles_version changes whenever any
+    handle is added or removed.
+
+    The boxes of continuous handles cover their whole motion during the
+    last frame, from the bounding rect they had at the previous call to
+    update_sweeps to the current one, which are kept in sweeps.
+
+    The points of polygon handles are packed in the rows of a capacity x
+    V x 2 array, local_vertices, where V is the largest number of points
+    of a polygon and shorter polygons repeat their last point, which does
+    not change their support. refresh_vertices moves the points of some
+    handles to where their colliders are into vertices, so batched GJK
+    can gather the pairs it tests by handle, with no packing.
+    vertex_counts is the number of points of each handle, or 0 if it is
+    not a polygon.
+    """
+
+    INITIAL_CAPACITY = 64
+
+    def __init__(self) -> None:
+        self.bounds = np.zeros((self.INITIAL_CAPACITY, 4))
+        self._bind_bounds()
+        self.local_vertices = np.zeros((self.INITIAL_CAPACITY, 1, 2))
+        self.vertices = np.zeros((self.INITIAL_CAPACITY, 1, 2))
+        self.vertex_counts = np.zeros(self.INITIAL_CAPACITY, dtype=np.int64)
+        self.owners = np.full(self.INITIAL_CAPACITY, -1, dtype=np.int64)
+        self.categories = np.ones(self.INITIAL_CAPACITY, dtype=np.int64)
+        self.masks = np.full(self.INITIAL_CAPACITY, -1, dtype=np.int64)
+        self.body_types = np.full(
+            self.INITIAL_CAPACITY, BodyType.DYNAMIC.value, dtype=np.int8
+        )
+        self.static_version = 0
+        self.handles_version = 0
+        self.objs: list[Collidable | None] = []
+        self.colliders: list[Collider | None] = []
+        self.obj_handles: dict[Collidable, list[int]] = {}
+        self.collider_handles: dict[Collider, int] = {}
+        self._next_owner = 0
+        self._free_handles: list[int] = []
+        self.continuous: set[int] = set()
+        self.sweeps: dict[int, tuple[Rect, Rect]] = {}
+
+    def __len__(self) -> int:
+        """Number of handles ever given, including the ones not in use"""
+        return len(self.colliders)
+
+    @property
+    def rects(self) -> RectArray:
+        """The bounding boxes of every handle, sharing the bounds array"""
+        return RectArray(self.bounds[: len(self.colliders)])
+
+    def add(self, obj: Collidable) -> list[int]:
+        handles = []
+        for collider in obj.get_colliders():
+            if self._free_handles:
+                handle = self._free_handles.pop()
+                self.objs[handle] = obj
+                self.colliders[handle] = collider
+            else:
+                handle = len(self.colliders)
+                self.objs.append(obj)
+                self.colliders.append(collider)
+            self.collider_handles[collider] = handle
+            handles.append(handle)
+        self._ensure_capacity(len(self.colliders))
+        self.owners[handles] = self._next_owner
+        self._next_owner += 1
+        self.obj_handles[obj] = handles
+        self.handles_version += 1
+        self.set_filter(handles, obj.collision_category, obj.collision_mask)
+        self.set_body_type(handles, obj.body_type)
+        self.refresh_handles(handles)
+        self._pack_vertices(handles)
+        return handles
+
+    def remove(self, obj: Collidable) -> list[int]:
+        handles = self.obj_handles.pop(obj)
+        for handle in handles:
+            collider = self.colliders[handle]
+            assert collider is not None
+            del self.collider_handles[collider]
+            self.objs[handle] = None
+            self.colliders[handle] = None
+        self.owners[handles] = -1
+        self.vertex_counts[handles] = 0
+        self.handles_version += 1
+        self.set_filter(handles, 1, -1)
+        self.set_body_type(handles, BodyType.DYNAMIC)
+        self.continuous.difference_update(handles)
+        for handle in handles:
+            self.sweeps.pop(handle, None)
+        self._free_handles.extend(handles)
+        return handles
+
+    def set_filter(self, handles: list[int], category: int, mask: int):
+        self.categories[handles] = category
+        self.masks[handles] = mask
+
+    def set_body_type(self, handles: list[int], body_type: BodyType):
+        static = BodyType.STATIC.value
+        if body_type == BodyType.STATIC or np.any(self.body_types[handles] == static):
+            self.static_version += 1
+        self.body_types[handles] = body_type.value
+
+    def can_collide(self, handles_1: np.ndarray, handles_2: np.ndarray) -> np.ndarray:
+        """Vectorized filter of pairs by category, mask and body type"""
+        categories, masks = self.categories, self.masks
+        dynamic = BodyType.DYNAMIC.value
+        return (
+            ((categories[handles_1] & masks[handles_2]) != 0)
+            & ((categories[handles_2] & masks[handles_1]) != 0)
+            & (
+                (self.body_types[handles_1] == dynamic)
+                | (self.body_types[handles_2] == dynamic)
+            )
+        )
+
+    def refresh_bounds(self):
+        """Reads the bounding rect of every collider into the bound arrays"""
+        n = len(self.colliders)
+        if n == 0:
+            return
+        for obj in self.obj_handles:
+            obj.sync_transform()
+        empty = Rect(0, 0, 0, 0)
+        self.rects.set_rects(
+            [
+                empty if collider is None else collider.bounding_rect
+                for collider in self.colliders
+            ]
+        )
+
+    def update_sweeps(self):
+        """Enlarges the boxes of continuous handles to cover their motion"""
+        for handle in self.continuous:
+            obj, collider = self.objs[handle], self.colliders[handle]
+            assert obj is not None and collider is not None
+            obj.sync_transform()
+            end = collider.bounding_rect
+            start = self.sweeps[handle][1] if handle in self.sweeps else end
+            self.sweeps[handle] = (start, end)
+            self.min_x[handle] = min(start.left, end.left)
+            self.max_x[handle] = max(start.right, end.right)
+            self.min_y[handle] = min(start.top, end.top)
+            self.max_y[handle] = max(start.bottom, end.bottom)
+
+    def live_handles(self) -> np.ndarray:
+        return np.flatnonzero(self.owners[: len(self.colliders)] >= 0)
+
+    def refresh_handles(self, handles: list[int]):
+        """Reads the bounding rect of the given handles' colliders"""
+        for handle in handles:
+            collider = self.colliders[handle]
+            assert collider is not None
+            rect = collider.bounding_rect
+            self.bounds[handle] = (rect.left, rect.top, rect.right, rect.bottom)
+
+    def refresh_vertices(self, handles: np.ndarray):
+        """Moves the points of the given polygon handles to their colliders"""
+        positions = []
+        for handle in handles.tolist():
+            collider = self.colliders[handle]
+            assert collider is not None
+            positions.append(collider.position)
+        offsets = np.array(positions, dtype=np.float64).reshape(-1, 1, 2)
+        self.vertices[handles] = self.local_vertices[handles] + offsets
+
+    def _pack_vertices(self, handles: list[int]):
+        """Writes the local points of the given polygon handles"""
+        for handle in handles:
+            collider = self.colliders[handle]
+            if not isinstance(collider, PolygonCollider):
+                continue
+            local = collider.local_array
+            n = len(local)
+            if n > self.local_vertices.shape[1]:
+                self._widen_vertices(n)
+            self.local_vertices[handle, :n] = local
+            self.local_vertices[handle, n:] = local[-1]
+            self.vertex_counts[handle] = n
+
+    def _widen_vertices(self, size: int):
+        """Makes room for polygons of size points, repeating the last ones"""
+        local = self.local_vertices
+        padding = np.repeat(local[:, -1:], size - local.shape[1], axis=1)
+        self.local_vertices = np.concatenate([local, padding], axis=1)
+        self.vertices = np.zeros_like(self.local_vertices)
+
+    def _bind_bounds(self):
+        self.min_x = self.bounds[:, 0]
+        self.min_y = self.bounds[:, 1]
+        self.max_x = self.bounds[:, 2]
+        self.max_y = self.bounds[:, 3]
+
+    def _ensure_capacity(self, size: int):
+        capacity = len(self.bounds)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        defaults = {
+            "bounds": 0,
+            "owners": -1,
+            "categories": 1,
+            "masks": -1,
+            "body_types": BodyType.DYNAMIC.value,
+            "local_vertices": 0,
+            "vertices": 0,
+            "vertex_counts": 0,
+        }
+        for name, default in defaults.items():
+            old = getattr(self, name)
+            array = np.full((capacity,) + old.shape[1:], default, dtype=old.dtype)
+            array[: len(old)] = old
+            setattr(self, name, array)
+        self._bind_bounds()
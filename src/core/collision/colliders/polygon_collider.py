@@ -1,41 +1,123 @@
-from numpy import array, ndarray
+from math import hypot
+
+from numpy import add, array, ndarray
 
 from ...utils import Pos, Rect
 from ..collider import Collider
 
 
 class PolygonCollider(Collider):
+    """
+    The points are stored once, in local space, and the collider only keeps
+    track of its position. The points in world space are computed when
+    someone asks for them and cached until the next move, so colliders that
+    move every frame but never reach the narrow phase do no vertex work.
+    """
+
     def __init__(self, points: list[Pos]):
         assert len(points) >= 3
         # assert self.__is_convex(points)
-        self._points = points
-        self._points_array = array(points)
+        self._local_points = tuple(points)
+        self._local_array = array(points, dtype=float)
+        self._points: list[Pos] | None = list(points)
+        self._points_array = self._local_array.copy()
+        self._array_is_valid = True
+        self._edge_normals = self._calculate_edge_normals()
+        self._normals_array = array(self._edge_normals).reshape(-1, 2)
+        self._local_extents = self._calculate_local_extents()
+        self._local_extents_array = array(self._local_extents).reshape(-1, 2)
         super().__init__()
 
     def _move(self, translation_vector: Pos):
         """Translates itself by translation_vector"""
-        self._points = [Pos.add(p, translation_vector) for p in self._points]
-        self._points_array = array(self._points)
+        self._points = None
+        self._array_is_valid = False
 
     def _point_collision(self, point: Pos) -> bool:
-        """Detects if a point is colliding"""
-        return False
-        raise NotImplementedError()
+        """
+        Detects if a point is colliding. The polygon is convex, so the point
+        is inside if its projection on every edge normal falls within the
+        projection of the polygon.
+        """
+        x, y = point.x - self._position.x, point.y - self._position.y
+        for (nx, ny), (low, high) in zip(self._edge_normals, self._local_extents):
+            projection = x * nx + y * ny
+            if projection < low or projection > high:
+                return False
+        return True
+
+    def points_collision(self, points: ndarray) -> ndarray:
+        local = points - self._position
+        projections = local @ self._normals_array.T
+        extents = self._local_extents_array
+        inside = (projections >= extents[:, 0]) & (projections <= extents[:, 1])
+        return inside.all(axis=1)
 
     def _calculate_bounding_rect(self) -> Rect:
-        left = min(p.x for p in self._points)
-        right = max(p.x for p in self._points)
-        top = min(p.y for p in self._points)
-        bottom = max(p.y for p in self._points)
+        left = min(p.x for p in self._local_points)
+        right = max(p.x for p in self._local_points)
+        top = min(p.y for p in self._local_points)
+        bottom = max(p.y for p in self._local_points)
         return Rect(left, top, right - left, bottom - top)
 
+    def _calculate_edge_normals(self) -> list[tuple[float, float]]:
+        """
+        Unit normals of the edges. They do not change when the polygon
+        moves, and parallel edges share a single normal, so a rectangle
+        only has two.
+        """
+        normals: dict[tuple[float, float], tuple[float, float]] = {}
+        points = self._local_points
+        for p, q in zip(points, points[1:] + points[:1]):
+            nx, ny = q.y - p.y, p.x - q.x
+            length = hypot(nx, ny)
+            if length == 0:
+                continue
+            nx, ny = nx / length, ny / length
+            if nx < 0 or (nx == 0 and ny < 0):
+                nx, ny = -nx, -ny
+            normals.setdefault((round(nx, 9), round(ny, 9)), (nx, ny))
+        return list(normals.values())
+
+    def _calculate_local_extents(self) -> list[tuple[float, float]]:
+        """Projection of the local points on each edge normal"""
+        extents = []
+        for nx, ny in self._edge_normals:
+            projections = [p.x * nx + p.y * ny for p in self._local_points]
+            extents.append((min(projections), max(projections)))
+        return extents
+
     @property
     def points(self) -> list[Pos]:
+        if self._points is None:
+            x, y = self._position
+            self._points = [Pos(p.x + x, p.y + y) for p in self._local_points]
         return self._points
 
     @property
     def as_array(self) -> ndarray:
+        """
+        The points as an N x 2 array. It is updated in place when the
+        collider moves, so copy it to keep the current points.
+        """
+        if not self._array_is_valid:
+            add(self._local_array, self._position, out=self._points_array)
+            self._array_is_valid = True
         return self._points_array
 
+    @property
+    def local_array(self) -> ndarray:
+        """The points in local space as an N x 2 array, which never changes"""
+        return self._local_array
+
+    @property
+    def edge_normals(self) -> list[tuple[float, float]]:
+        return self._edge_normals
+
+    @property
+    def local_extents(self) -> list[tuple[float, float]]:
+        """For each edge normal, the projection of the points in local space"""
+        return self._local_extents
+
     def __is_convex(self, points: list[Pos]) -> bool:
         raise NotImplementedError()
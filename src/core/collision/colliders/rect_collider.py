@@ -6,20 +6,27 @@ from .polygon_collider import PolygonCollider
 
 class RectCollider(PolygonCollider):
     def __init__(self, rect: Rect):
-        self.rect = rect
+        self._local_rect = rect
+        self._rect: Rect | None = rect
         super().__init__(
             [rect.top_left, rect.bottom_left, rect.bottom_right, rect.top_right]
         )
 
+    @property
+    def rect(self) -> Rect:
+        if self._rect is None:
+            self._rect = Rect.move(self._local_rect, self._position)
+        return self._rect
+
     @override
     def _point_collision(self, point: Pos) -> bool:
-        # At this point, collision already failed for bounding rect
-        return False
+        # At this point, the point is inside the bounding rect, which is rect
+        return True
 
     @override
     def _calculate_bounding_rect(self) -> Rect:
-        return self.rect
+        return self._local_rect
 
     def _move(self, translation_vector: Pos):
         super()._move(translation_vector)
-        self.rect = Rect.move(self.rect, translation_vector)
+        self._rect = None
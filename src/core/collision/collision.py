@@ -67,3 +67,55 @@ class Collision(PreCollision):
 
     def __hash__(self) -> int:
         return hash((hash(super()), self.minimal_translation_vector))
+
+
+@dataclass(unsafe_hash=False, kw_only=True, frozen=True, eq=False)
+class ContinuousCollision(Collision):
+    """
+    A collision involving a collider with continuous collision detection.
+    time_of_impact is the fraction of the last frame at which the colliders
+    first touched. If they no longer intersect at the end of the frame (the
+    faster one went through the other), the minimal translation vector takes
+    obj_1 back to where it touched obj_2.
+    """
+
+    time_of_impact: float
+
+
+@dataclass(kw_only=True, frozen=True)
+class CollisionEvents:
+    """
+    How the collisions changed since the previous frame. ended holds the
+    last collision of each pair that stopped colliding.
+    """
+
+    began: set[Collision]
+    stayed: set[Collision]
+    ended: set[Collision]
+
+
+@dataclass(kw_only=True, frozen=True)
+class RaycastHit:
+    """
+    A collider hit by a ray (see CollisionManager2D.raycast). distance is
+    measured along the ray from its origin to point, and normal is the unit
+    normal of the side of the collider the ray went through.
+    """
+
+    obj: Collidable
+    collider: Collider
+    distance: float
+    point: Pos
+    normal: Pos
+
+
+@dataclass(kw_only=True, frozen=True)
+class ShapeCastHit:
+    """
+    A collider hit by a moving collider (see CollisionManager2D.shape_cast).
+    time_of_impact is the fraction of the motion after which they touch.
+    """
+
+    obj: Collidable
+    collider: Collider
+    time_of_impact: float
@@ -1,2 +1,17 @@
+from .batched_gjk import (
+    batched_gjk_algorithm_2d,
+    batched_gjk_search_2d,
+    pack_polygons,
+)
 from .collision_detector import CollisionDetector
-from .gjk import gjk_algorithm_2d
+from .gjk import gjk_algorithm_2d, gjk_search_2d
+from .gjk_warm_start_cache import GJKWarmStartCache
+from .ray_cast import (
+    gjk_time_of_impact,
+    ray_aabb_distances,
+    ray_collider_intersection,
+    ray_slab_intersection,
+)
+from .sat import sat_collision_2d
+from .scalar_gjk import scalar_gjk_algorithm_2d, scalar_gjk_search_2d
+from .swept_aabb import swept_aabb_time_of_impact
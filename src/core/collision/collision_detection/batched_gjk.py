@@ -0,0 +1,212 @@
+import numpy as np
+
+from ...utils import FrameProfiler
+from .gjk import gjk_search_2d
+
+MAX_BATCHED_GJK_ITERATIONS = 64
+
+
+def pack_polygons(polygons: list[np.ndarray]) -> np.ndarray:
+    """
+    Packs a list of N_i x 2 arrays of points into a single P x N x 2
+    array, where N is the largest N_i. Shorter polygons are padded by
+    repeating their last vertex, which does not change their support.
+    """
+    size = max((len(polygon) for polygon in polygons), default=1)
+    packed = np.empty((len(polygons), size, 2), dtype=np.float64)
+    for i, polygon in enumerate(polygons):
+        n = len(polygon)
+        packed[i, :n] = polygon
+        packed[i, n:] = polygon[-1]
+    return packed
+
+
+def batched_gjk_algorithm_2d(
+    polys1: np.ndarray,
+    polys2: np.ndarray,
+    initial_directions: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Runs gjk_algorithm_2d on P pairs of polygons at once. Assumes polys1
+    and polys2 are P x N x 2 arrays (see pack_polygons) and returns a
+    boolean array of size P telling which pairs collide.
+    """
+    return batched_gjk_search_2d(polys1, polys2, initial_directions)[0]
+
+
+def batched_gjk_search_2d(
+    polys1: np.ndarray,
+    polys2: np.ndarray,
+    initial_directions: np.ndarray | None = None,
+    initial_simplices: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Batched version of gjk_search_2d that can be warm started from a
+    previous run on the same pairs:
+        initial_directions (P x 2): the last search direction of each pair,
+            where a row of zeros means the pair has none.
+        initial_simplices (P x 3 x 2): the terminal simplex of the pairs that
+            collided, as (index in poly1, index in poly2) for each of its
+            three points, or -1 if the pair has none. If the simplex still
+            contains the origin, the pair collides with no support call.
+    Returns which pairs collide, the last search direction of each pair and
+    the terminal simplex of each pair, in the same formats.
+    """
+    n_pairs = len(polys1)
+    result = np.zeros(n_pairs, dtype=bool)
+    direction = np.zeros((n_pairs, 2), dtype=np.float64)
+    simplices = np.full((n_pairs, 3, 2), -1, dtype=np.int64)
+    if n_pairs == 0:
+        return result, direction, simplices
+    resolved = np.zeros(n_pairs, dtype=bool)
+    if initial_simplices is not None:
+        seeded = np.flatnonzero(initial_simplices[:, 0, 0] >= 0)
+        indices = np.minimum(
+            initial_simplices[seeded], (polys1.shape[1] - 1, polys2.shape[1] - 1)
+        )
+        triangle = (
+            polys1[seeded[:, None], indices[:, :, 0]]
+            - polys2[seeded[:, None], indices[:, :, 1]]
+        )
+        contained = seeded[_contains_origin(triangle)]
+        result[contained] = resolved[contained] = True
+        simplices[contained] = initial_simplices[contained]
+
+    initial_point = polys1[:, 0] - polys2[:, 0]
+    initial_index = np.zeros((n_pairs, 2), dtype=np.int64)
+    if initial_directions is not None:
+        direction[:] = initial_directions
+        seeded = np.flatnonzero(initial_directions.any(axis=1) & ~resolved)
+        d = direction[seeded]
+        a, a_index = _full_support(d, polys1[seeded], polys2[seeded])
+        initial_point[seeded] = a
+        initial_index[seeded] = a_index
+        origin_hit = ~a.any(axis=1)
+        result[seeded[origin_hit]] = True
+        resolved[seeded[origin_hit | (_dot(a, d) < 0)]] = True
+    active = np.flatnonzero(~resolved)
+
+    simplex_b = initial_point.copy()
+    simplex_c = np.zeros_like(initial_point)
+    index_b = initial_index
+    index_c = np.zeros_like(initial_index)
+    simplex_len = np.ones(n_pairs, dtype=np.int8)
+    direction[active] = -initial_point[active]
+    profiler = FrameProfiler()
+    for _ in range(MAX_BATCHED_GJK_ITERATIONS):
+        if len(active) == 0:
+            return result, direction, simplices
+        profiler.count("collision.gjk_iterations")
+        profiler.count("collision.gjk_support_calls", len(active))
+        d = direction[active]
+        a, a_index = _full_support(d, polys1[active], polys2[active])
+
+        origin_hit = (a[:, 0] == 0) & (a[:, 1] == 0)
+        separated = _dot(a, d) < 0
+        result[active[origin_hit]] = True
+        keep = ~(origin_hit | separated)
+        active, a, a_index = active[keep], a[keep], a_index[keep]
+
+        b, c, length = simplex_b[active], simplex_c[active], simplex_len[active]
+        new_c, new_len, new_direction, from_b, collided = _do_simplex(b, c, length, a)
+        b_index, c_index = index_b[active], index_c[active]
+        hits = active[collided]
+        result[hits] = True
+        simplices[hits] = np.stack(
+            (a_index[collided], b_index[collided], c_index[collided]), axis=1
+        )
+        simplex_b[active] = a
+        simplex_c[active] = new_c
+        index_b[active] = a_index
+        index_c[active] = np.where(from_b[:, None], b_index, c_index)
+        simplex_len[active] = new_len
+        # Pairs that collided keep their last direction
+        direction[active[~collided]] = new_direction[~collided]
+        active = active[~collided]
+
+    # Pairs that did not converge are resolved one by one
+    for i in active:
+        result[i], direction[i] = gjk_search_2d(polys1[i], polys2[i], direction[i])
+    return result, direction, simplices
+
+
+def _do_simplex(
+    b: np.ndarray, c: np.ndarray, length: np.ndarray, a: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized do_simplex. The simplex of each pair is stored as the
+    points (b, c) together with its length (1 or 2), and a is the point
+    that was just added. As in do_simplex, the new simplex is [a, c] or
+    [a, b] (or just [a]), so this returns its second point, its length,
+    the new direction, a mask of the pairs whose second point is b, and
+    a mask of the pairs whose simplex contains the origin.
+    """
+    d = -a
+    ab, ac = b - a, c - a
+    new_c = c.copy()
+    new_len = np.ones(len(a), dtype=np.int8)
+    new_direction = d.copy()
+    from_b = np.zeros(len(a), dtype=bool)
+    collided = np.zeros(len(a), dtype=bool)
+
+    # Line case: the simplex had a single point b
+    line = length == 1
+    towards_b = line & (_dot(ab, d) > 0)
+    perpendicular = _perp(ab)
+    flip = _dot(perpendicular, d) < 0
+    perpendicular[flip] = -perpendicular[flip]
+    from_b[towards_b] = True
+    new_direction[towards_b] = perpendicular[towards_b]
+
+    # Triangle case: the simplex had two points b and c
+    triangle = ~line
+    alpha = _perp(ac)
+    flip = _dot(alpha, ab) > 0
+    alpha[flip] = -alpha[flip]
+    beta = -_perp(ab)
+    flip = _dot(beta, ac) > 0
+    beta[flip] = -beta[flip]
+    outside_alpha = triangle & (_dot(alpha, d) > 0)
+    outside_beta = triangle & ~outside_alpha & (_dot(beta, d) > 0)
+    towards_c = outside_alpha & (_dot(ac, d) > 0)
+    new_len[towards_c] = 2
+    new_direction[towards_c] = alpha[towards_c]
+    towards_b_side = outside_beta & (_dot(ab, d) > 0)
+    from_b[towards_b_side] = True
+    new_direction[towards_b_side] = beta[towards_b_side]
+    collided[triangle & ~outside_alpha & ~outside_beta] = True
+
+    new_c[from_b] = b[from_b]
+    new_len[from_b] = 2
+    return new_c, new_len, new_direction, from_b, collided
+
+
+def _full_support(
+    directions: np.ndarray, polys1: np.ndarray, polys2: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Support points of the Minkowski differences and their vertex indices"""
+    rows = np.arange(len(directions))
+    index_1 = np.argmax(np.einsum("pnk,pk->pn", polys1, directions), axis=1)
+    index_2 = np.argmax(np.einsum("pnk,pk->pn", polys2, -directions), axis=1)
+    points = polys1[rows, index_1] - polys2[rows, index_2]
+    return points, np.stack((index_1, index_2), axis=1)
+
+
+def _contains_origin(triangles: np.ndarray) -> np.ndarray:
+    """Tells which of the P x 3 x 2 non-degenerate triangles contain the origin"""
+    p, q, r = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    area = _cross(q - p, r - p)
+    sides = np.stack((_cross(q - p, -p), _cross(r - q, -q), _cross(p - r, -r)))
+    return (area != 0) & np.all(sides * np.sign(area) >= 0, axis=0)
+
+
+def _cross(v1: np.ndarray, v2: np.ndarray) -> np.ndarray:
+    return v1[:, 0] * v2[:, 1] - v1[:, 1] * v2[:, 0]
+
+
+def _dot(v1: np.ndarray, v2: np.ndarray) -> np.ndarray:
+    return v1[:, 0] * v2[:, 0] + v1[:, 1] * v2[:, 1]
+
+
+def _perp(v: np.ndarray) -> np.ndarray:
+    return np.stack((-v[:, 1], v[:, 0]), axis=1)
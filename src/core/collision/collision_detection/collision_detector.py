@@ -1,10 +1,32 @@
-from ...utils import Pos, Rect
+from typing import Callable
+
+import numpy as np
+
+from ...utils import Pos
 from ..collider import Collider
 from ..colliders import PolygonCollider, RectCollider
-from .gjk import gjk_algorithm_2d
+from .gjk import gjk_search_2d
+from .sat import sat_collision_2d
+from .scalar_gjk import scalar_gjk_search_2d
+
+Kernel = Callable[[Collider, Collider], Pos | None]
 
 
 class CollisionDetector:
+    """
+    Collisions are resolved by kernels registered for a pair of collider
+    types with CollisionDetector.register. A pair of types without a kernel
+    of its own uses the kernel of the closest pair of base classes.
+    """
+
+    SAT_MAX_VERTICES = 8
+    # Below this many vertices the scalar GJK beats the NumPy one
+    # (see test/gjk_benchmark.py)
+    SCALAR_GJK_MAX_VERTICES = 48
+
+    _kernels: dict[tuple[type, type], Kernel] = {}
+    _resolved_kernels: dict[tuple[type, type], Kernel] = {}
+
     def __init__(self):
         pass
 
@@ -16,27 +38,136 @@ class CollisionDetector:
         that separates the two (obj_1 + V does no intersect
         with obj_2).
         """
-        if isinstance(obj_1, RectCollider) and isinstance(obj_2, RectCollider):
-            return CollisionDetector.AABBCollision(obj_1, obj_2)
-        elif isinstance(obj_1, PolygonCollider) and isinstance(obj_2, PolygonCollider):
-            return (
-                Pos(0, 0) if gjk_algorithm_2d(obj_1.as_array, obj_2.as_array) else None
-            )
-        else:
-            raise NotImplementedError()
+        return CollisionDetector.kernel_for(type(obj_1), type(obj_2))(obj_1, obj_2)
+
+    @classmethod
+    def register(cls, type_1: type, type_2: type) -> Callable[[Kernel], Kernel]:
+        """
+        Decorator registering a kernel for colliders of type_1 and type_2.
+        The kernel is also used for the swapped pair, with its minimal
+        translation vector inverted.
+        """
+
+        def decorator(kernel: Kernel) -> Kernel:
+            cls._kernels[(type_1, type_2)] = kernel
+            if type_1 is not type_2:
+                cls._kernels[(type_2, type_1)] = _swapped(kernel)
+            cls._resolved_kernels.clear()
+            return kernel
+
+        return decorator
+
+    @classmethod
+    def kernel_for(cls, type_1: type, type_2: type) -> Kernel:
+        key = (type_1, type_2)
+        if key in cls._resolved_kernels:
+            return cls._resolved_kernels[key]
+        for base_1 in type_1.__mro__:
+            for base_2 in type_2.__mro__:
+                if (base_1, base_2) in cls._kernels:
+                    kernel = cls._kernels[(base_1, base_2)]
+                    cls._resolved_kernels[key] = kernel
+                    return kernel
+        raise NotImplementedError()
 
     @staticmethod
-    def AABBCollision(obj_1: RectCollider, obj_2: RectCollider) -> Pos | None:
-        return Pos(0, 0)
+    def uses_gjk(obj_1: Collider, obj_2: Collider) -> bool:
+        """
+        Tells if collide resolves the pair (obj_1, obj_2) with the polygon
+        kernel, whose result can also be obtained with batched_gjk_algorithm_2d.
+        """
+        kernel = CollisionDetector.kernel_for(type(obj_1), type(obj_2))
+        return kernel is polygon_collision
 
-        def check(rect_1: Rect, rect_2: Rect) -> bool:
-            return (
-                rect_1.left <= rect_2.right
-                and rect_1.right >= rect_2.left
-                and rect_1.top <= rect_2.bottom
-                and rect_1.bottom >= rect_2.top
-            )
+    @staticmethod
+    def minimal_translation_vector(
+        obj_1: PolygonCollider, obj_2: PolygonCollider
+    ) -> Pos:
+        """
+        Minimal translation vector of two polygons known to be colliding.
+        It is only computed for polygons small enough for the separating
+        axis test, otherwise it is Pos(0, 0).
+        """
+        if not CollisionDetector.is_small(obj_1, obj_2):
+            return Pos(0, 0)
+        vector = sat_collision_2d(
+            obj_1.points, obj_1.edge_normals, obj_2.points, obj_2.edge_normals
+        )
+        return Pos(0, 0) if vector is None else Pos(*vector)
 
+    @staticmethod
+    def gjk_search(
+        obj_1: PolygonCollider,
+        obj_2: PolygonCollider,
+        initial_direction: tuple[float, float] | None = None,
+    ) -> tuple[bool, tuple[float, float]]:
+        """
+        Tells if two polygons collide with the scalar GJK, or the NumPy one
+        above SCALAR_GJK_MAX_VERTICES, and returns the last search direction
+        to warm start the next test of the same pair.
+        """
+        if CollisionDetector.is_small(
+            obj_1, obj_2, CollisionDetector.SCALAR_GJK_MAX_VERTICES
+        ):
+            return scalar_gjk_search_2d(obj_1.points, obj_2.points, initial_direction)
+        seed = None if initial_direction is None else np.array(initial_direction)
+        collided, direction = gjk_search_2d(obj_1.as_array, obj_2.as_array, seed)
+        dx, dy = direction.tolist()
+        return collided, (dx, dy)
+
+    @staticmethod
+    def is_small(
+        obj_1: PolygonCollider, obj_2: PolygonCollider, max_vertices: int | None = None
+    ) -> bool:
+        if max_vertices is None:
+            max_vertices = CollisionDetector.SAT_MAX_VERTICES
+        return len(obj_1.points) <= max_vertices and len(obj_2.points) <= max_vertices
+
+    @staticmethod
+    def AABBCollision(obj_1: RectCollider, obj_2: RectCollider) -> Pos | None:
+        """
+        Exact collision of two rects. The minimal translation vector is
+        along the axis in which they overlap the least.
+        """
         rect_1, rect_2 = obj_1.rect, obj_2.rect
-        collide = check(rect_1, rect_2) or check(rect_2, rect_1)
-        return Pos(0, 0) if collide else None
+        # Distances to push rect_1 left, right, up or down out of rect_2
+        left, right = rect_1.right - rect_2.left, rect_2.right - rect_1.left
+        up, down = rect_1.bottom - rect_2.top, rect_2.bottom - rect_1.top
+        overlap_x, overlap_y = min(left, right), min(up, down)
+        if overlap_x < 0 or overlap_y < 0:
+            return None
+        if overlap_x <= overlap_y:
+            return Pos(-left if left < right else right, 0)
+        return Pos(0, -up if up < down else down)
+
+
+def _swapped(kernel: Kernel) -> Kernel:
+    def swapped_kernel(obj_1: Collider, obj_2: Collider) -> Pos | None:
+        vector = kernel(obj_2, obj_1)
+        return None if vector is None else Pos.inv(vector)
+
+    return swapped_kernel
+
+
+@CollisionDetector.register(RectCollider, RectCollider)
+def rect_collision(obj_1: Collider, obj_2: Collider) -> Pos | None:
+    assert isinstance(obj_1, RectCollider) and isinstance(obj_2, RectCollider)
+    return CollisionDetector.AABBCollision(obj_1, obj_2)
+
+
+@CollisionDetector.register(PolygonCollider, PolygonCollider)
+def polygon_collision(obj_1: Collider, obj_2: Collider) -> Pos | None:
+    """
+    Small polygons only run the separating axis test on their precomputed
+    edge normals, which gives both the hit and the minimal translation
+    vector. Larger polygons are tested with the scalar GJK, or the NumPy
+    one above SCALAR_GJK_MAX_VERTICES. GJK does not compute the vector, so
+    it is Pos(0, 0) for them.
+    """
+    assert isinstance(obj_1, PolygonCollider) and isinstance(obj_2, PolygonCollider)
+    if CollisionDetector.is_small(obj_1, obj_2):
+        vector = sat_collision_2d(
+            obj_1.points, obj_1.edge_normals, obj_2.points, obj_2.edge_normals
+        )
+        return None if vector is None else Pos(*vector)
+    return Pos(0, 0) if CollisionDetector.gjk_search(obj_1, obj_2)[0] else None
@@ -1,20 +1,42 @@
 import numpy as np
 
 
-def gjk_algorithm_2d(poly1: np.ndarray, poly2: np.ndarray) -> bool:
+def gjk_algorithm_2d(
+    poly1: np.ndarray, poly2: np.ndarray, initial_direction: np.ndarray | None = None
+) -> bool:
     """Assumes poly1 and poly2 are N x 2 arrays of points"""
-    initial_point = poly1[0] - poly2[0]
+    return gjk_search_2d(poly1, poly2, initial_direction)[0]
+
+
+def gjk_search_2d(
+    poly1: np.ndarray, poly2: np.ndarray, initial_direction: np.ndarray | None = None
+) -> tuple[bool, np.ndarray]:
+    """
+    Same as gjk_algorithm_2d, but also returns the last search direction.
+    If the polygons are separated, it is a separating direction, so passing
+    it as initial_direction on the next frame usually resolves the same
+    pair with a single support call while the polygons stay apart.
+    """
+    if initial_direction is None or not initial_direction.any():
+        initial_point = poly1[0] - poly2[0]
+    else:
+        initial_point = full_support(initial_direction, poly1, poly2)
+        if not initial_point.any():
+            return True, initial_direction
+        if np.dot(initial_point, initial_direction) < 0:
+            return False, initial_direction
     simplex = [initial_point]
     direction = -initial_point
     while True:
         new_point = full_support(direction, poly1, poly2)
         if list(new_point) == [0, 0]:
-            return True
+            return True, direction
         if np.dot(new_point, direction) < 0:
-            return False
-        simplex, direction, collided = do_simplex(simplex, new_point)
+            return False, direction
+        simplex, new_direction, collided = do_simplex(simplex, new_point)
         if collided:
-            return True
+            return True, direction
+        direction = new_direction
 
 
 def do_simplex(
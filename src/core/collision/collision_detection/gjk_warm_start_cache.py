@@ -0,0 +1,81 @@
+import numpy as np
+
+_NO_DIRECTION = (0.0, 0.0)
+_NO_SIMPLEX = ((-1, -1), (-1, -1), (-1, -1))
+
+
+class GJKWarmStartCache:
+    """
+    Remembers, for each pair of handles, the last GJK search direction and,
+    if the pair collided, the terminal simplex, so the next GJK run for the
+    same pair can start from them (see batched_gjk_search_2d). Pairs tested
+    one by one only keep a direction (see scalar_gjk_search_2d). They are
+    only hints: a missing or outdated entry makes GJK slower, never wrong.
+    """
+
+    def __init__(self) -> None:
+        self._directions: dict[tuple[int, int], tuple[float, float]] = {}
+        self._simplices: dict[tuple[int, int], tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._directions)
+
+    def seeds(self, pairs: list[tuple[int, int]]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Cached directions (P x 2) and simplices (P x 3 x 2) of the pairs,
+        with zeros and -1 respectively for unknown pairs.
+        """
+        directions, simplices = self._directions, self._simplices
+        return (
+            np.array(
+                [directions.get(pair, _NO_DIRECTION) for pair in pairs],
+                dtype=np.float64,
+            ).reshape(len(pairs), 2),
+            np.array(
+                [simplices.get(pair, _NO_SIMPLEX) for pair in pairs], dtype=np.int64
+            ).reshape(len(pairs), 3, 2),
+        )
+
+    def direction(self, pair: tuple[int, int]) -> tuple[float, float] | None:
+        return self._directions.get(pair)
+
+    def store_direction(self, pair: tuple[int, int], direction: tuple[float, float]):
+        self._directions[pair] = direction
+
+    def store(
+        self,
+        pairs: list[tuple[int, int]],
+        directions: np.ndarray,
+        simplices: np.ndarray,
+    ):
+        self._directions.update(zip(pairs, map(tuple, directions.tolist())))
+        for pair, simplex in zip(pairs, simplices.tolist()):
+            if simplex[0][0] >= 0:
+                self._simplices[pair] = simplex
+            else:
+                self._simplices.pop(pair, None)
+
+    def retain(self, pairs: set[tuple[int, int]]):
+        """Evicts the pairs that are no longer in the broad phase"""
+        self._directions = {
+            pair: direction
+            for pair, direction in self._directions.items()
+            if pair in pairs
+        }
+        self._simplices = {
+            pair: simplex for pair, simplex in self._simplices.items() if pair in pairs
+        }
+
+    def forget(self, handles: list[int]):
+        """Evicts the pairs of handles that were removed, so they can be reused"""
+        removed = set(handles)
+        self._directions = {
+            pair: direction
+            for pair, direction in self._directions.items()
+            if pair[0] not in removed and pair[1] not in removed
+        }
+        self._simplices = {
+            pair: simplex
+            for pair, simplex in self._simplices.items()
+            if pair[0] not in removed and pair[1] not in removed
+        }
@@ -0,0 +1,133 @@
+import numpy as np
+
+from ...utils import Pos
+from ..collider import Collider
+from ..colliders import PolygonCollider
+from .scalar_gjk import scalar_gjk_algorithm_2d
+
+TIME_OF_IMPACT_ITERATIONS = 24
+
+
+def ray_collider_intersection(
+    origin: Pos, direction: Pos, collider: Collider, max_distance: float
+) -> tuple[float, Pos] | None:
+    """
+    ray_slab_intersection with the slabs of the edge normals of a polygon,
+    or of the bounding rect of other colliders.
+    """
+    if isinstance(collider, PolygonCollider):
+        x, y = collider.position
+        return ray_slab_intersection(
+            Pos(origin.x - x, origin.y - y),
+            direction,
+            collider.edge_normals,
+            collider.local_extents,
+            max_distance,
+        )
+    rect = collider.bounding_rect
+    return ray_slab_intersection(
+        origin,
+        direction,
+        [(1, 0), (0, 1)],
+        [(rect.left, rect.right), (rect.top, rect.bottom)],
+        max_distance,
+    )
+
+
+def ray_slab_intersection(
+    origin: Pos,
+    direction: Pos,
+    normals: list[tuple[float, float]],
+    extents: list[tuple[float, float]],
+    max_distance: float,
+) -> tuple[float, Pos] | None:
+    """
+    A convex shape is the intersection of the slabs low <= normal . p <=
+    high, for each normal and its extents (low, high). Returns the distance
+    t at which the ray origin + t * direction (direction has length 1)
+    enters the shape and the normal of the side it enters through, if it
+    does for some t between 0 and max_distance. A ray that starts inside
+    the shape enters it at t = 0, through the side facing the ray.
+    """
+    ox, oy = origin
+    dx, dy = direction
+    entry, exit = 0.0, max_distance
+    entry_normal = Pos(-dx, -dy)
+    for (nx, ny), (low, high) in zip(normals, extents):
+        start = nx * ox + ny * oy
+        speed = nx * dx + ny * dy
+        if speed == 0:
+            if start < low or start > high:
+                return None
+            continue
+        t_1, t_2 = (low - start) / speed, (high - start) / speed
+        if speed > 0:
+            normal = Pos(-nx, -ny)
+        else:
+            t_1, t_2 = t_2, t_1
+            normal = Pos(nx, ny)
+        if t_1 > entry:
+            entry, entry_normal = t_1, normal
+        exit = min(exit, t_2)
+        if entry > exit:
+            return None
+    return entry, entry_normal
+
+
+def ray_aabb_distances(
+    origins: np.ndarray,
+    directions: np.ndarray,
+    mins: np.ndarray,
+    maxs: np.ndarray,
+    max_distance: float,
+) -> np.ndarray:
+    """
+    For M rays (M x 2 origins and unit directions) and N boxes (N x 2 mins
+    and maxs), an M x N array with the distance at which each ray enters
+    each box, or infinity if it does not within max_distance. mins and maxs
+    can also be M x N x 2, for different boxes per ray.
+    """
+    origins, directions = origins[:, None, :], directions[:, None, :]
+    parallel = directions == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_1 = (mins - origins) / directions
+        t_2 = (maxs - origins) / directions
+    # A ray parallel to a slab is always or never within it
+    within = (mins <= origins) & (origins <= maxs)
+    near = np.where(parallel, np.where(within, -np.inf, np.inf), np.minimum(t_1, t_2))
+    far = np.where(parallel, np.where(within, np.inf, -np.inf), np.maximum(t_1, t_2))
+    entry = np.maximum(near.max(axis=2), 0)
+    exit = np.minimum(far.min(axis=2), max_distance)
+    return np.where(entry <= exit, entry, np.inf)
+
+
+def gjk_time_of_impact(
+    points_1: list[Pos], motion: Pos, points_2: list[Pos], start: float = 0.0
+) -> float | None:
+    """
+    The first fraction t of motion at which the convex hull of points_1,
+    moved by t * motion, touches the convex hull of points_2, or None if
+    it does not for any t between start and 1. They touch before t if and
+    only if the hull of points_1 and points_1 moved by t * motion (the
+    shape swept until t) intersects points_2, which is a single GJK test,
+    so t is found by bisection. start is a time before which they cannot
+    touch, such as the time of impact of their bounding boxes.
+    """
+    mx, my = motion
+
+    def touches_by(t: float) -> bool:
+        swept = points_1 + [Pos(x + t * mx, y + t * my) for x, y in points_1]
+        return scalar_gjk_algorithm_2d(swept, points_2)
+
+    if not touches_by(1):
+        return None
+    low, high = start, 1.0
+    if touches_by(low):
+        return low
+    for _ in range(TIME_OF_IMPACT_ITERATIONS):
+        middle = (low + high) / 2
+        if touches_by(middle):
+            high = middle
+        else:
+            low = middle
+    return high
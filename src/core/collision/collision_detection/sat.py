@@ -0,0 +1,32 @@
+from ...utils import Pos
+
+
+def sat_collision_2d(
+    points_1: list[Pos],
+    normals_1: list[tuple[float, float]],
+    points_2: list[Pos],
+    normals_2: list[tuple[float, float]],
+) -> tuple[float, float] | None:
+    """
+    Separating axis test for two convex polygons, given their points and
+    unit edge normals. If they do not collide, returns None. Otherwise,
+    returns the minimal translation vector that moves polygon 1 out of
+    polygon 2.
+    """
+    best_overlap = float("inf")
+    best_axis = (0.0, 0.0)
+    for nx, ny in normals_1 + normals_2:
+        projections_1 = [p.x * nx + p.y * ny for p in points_1]
+        projections_2 = [p.x * nx + p.y * ny for p in points_2]
+        min_1, max_1 = min(projections_1), max(projections_1)
+        min_2, max_2 = min(projections_2), max(projections_2)
+        # Distances to push polygon 1 backwards or forwards along the axis
+        backwards, forwards = max_1 - min_2, max_2 - min_1
+        overlap = min(backwards, forwards)
+        if overlap < 0:
+            return None
+        if overlap < best_overlap:
+            best_overlap = overlap
+            sign = -1 if backwards < forwards else 1
+            best_axis = (sign * nx, sign * ny)
+    return best_axis[0] * best_overlap, best_axis[1] * best_overlap
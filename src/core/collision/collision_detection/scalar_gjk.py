@@ -0,0 +1,100 @@
+from ...utils import Pos
+
+
+def scalar_gjk_algorithm_2d(
+    points1: list[Pos],
+    points2: list[Pos],
+    initial_direction: tuple[float, float] | None = None,
+) -> bool:
+    """
+    Same as gjk_algorithm_2d, but works on the points as plain tuples and
+    keeps the simplex in local variables, so it allocates no arrays. For
+    polygons with few vertices this is faster than the NumPy version,
+    whose cost is dominated by creating small arrays.
+    """
+    return scalar_gjk_search_2d(points1, points2, initial_direction)[0]
+
+
+def scalar_gjk_search_2d(
+    points1: list[Pos],
+    points2: list[Pos],
+    initial_direction: tuple[float, float] | None = None,
+) -> tuple[bool, tuple[float, float]]:
+    """
+    Same as gjk_search_2d: also returns the last search direction, which
+    can be passed as initial_direction on the next frame.
+    """
+    # The simplex is [a, b, c] with its newest point first
+    if initial_direction is None or initial_direction == (0, 0):
+        bx = points1[0][0] - points2[0][0]
+        by = points1[0][1] - points2[0][1]
+    else:
+        dx, dy = initial_direction
+        bx, by = _full_support(dx, dy, points1, points2)
+        if bx == 0 and by == 0:
+            return True, (dx, dy)
+        if bx * dx + by * dy < 0:
+            return False, (dx, dy)
+    cx = cy = 0.0
+    simplex_len = 1
+    dx, dy = -bx, -by
+    while True:
+        ax, ay = _full_support(dx, dy, points1, points2)
+        if ax == 0 and ay == 0:
+            return True, (dx, dy)
+        if ax * dx + ay * dy < 0:
+            return False, (dx, dy)
+        ox, oy = -ax, -ay
+        abx, aby = bx - ax, by - ay
+        if simplex_len == 1:
+            if abx * ox + aby * oy > 0:
+                dx, dy = -aby, abx
+                if dx * ox + dy * oy < 0:
+                    dx, dy = -dx, -dy
+                cx, cy = bx, by
+                simplex_len = 2
+            else:
+                dx, dy = ox, oy
+            bx, by = ax, ay
+            continue
+        acx, acy = cx - ax, cy - ay
+        alpha_x, alpha_y = -acy, acx
+        if alpha_x * abx + alpha_y * aby > 0:
+            alpha_x, alpha_y = -alpha_x, -alpha_y
+        beta_x, beta_y = aby, -abx
+        if beta_x * acx + beta_y * acy > 0:
+            beta_x, beta_y = -beta_x, -beta_y
+        if alpha_x * ox + alpha_y * oy > 0:
+            if acx * ox + acy * oy > 0:
+                dx, dy = alpha_x, alpha_y
+            else:
+                dx, dy = ox, oy
+                simplex_len = 1
+        elif beta_x * ox + beta_y * oy > 0:
+            if abx * ox + aby * oy > 0:
+                dx, dy = beta_x, beta_y
+                cx, cy = bx, by
+            else:
+                dx, dy = ox, oy
+                simplex_len = 1
+        else:
+            return True, (dx, dy)
+        bx, by = ax, ay
+
+
+def _full_support(
+    dx: float, dy: float, points1: list[Pos], points2: list[Pos]
+) -> tuple[float, float]:
+    best_1 = points1[0]
+    best_dot = best_1[0] * dx + best_1[1] * dy
+    for point in points1:
+        dot = point[0] * dx + point[1] * dy
+        if dot > best_dot:
+            best_1, best_dot = point, dot
+    best_2 = points2[0]
+    best_dot = -(best_2[0] * dx + best_2[1] * dy)
+    for point in points2:
+        dot = -(point[0] * dx + point[1] * dy)
+        if dot > best_dot:
+            best_2, best_dot = point, dot
+    return best_1[0] - best_2[0], best_1[1] - best_2[1]
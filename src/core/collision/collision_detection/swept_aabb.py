@@ -0,0 +1,28 @@
+from ...utils import Rect
+
+
+def swept_aabb_time_of_impact(
+    start_1: Rect, end_1: Rect, start_2: Rect, end_2: Rect
+) -> float | None:
+    """
+    Rects 1 and 2 move in a straight line from start to end during a frame.
+    Returns the fraction of the frame (between 0 and 1) at which they first
+    touch, or None if they do not touch during the frame.
+    """
+    dx = (end_1.x - start_1.x) - (end_2.x - start_2.x)
+    dy = (end_1.y - start_1.y) - (end_2.y - start_2.y)
+    entry, exit = 0.0, 1.0
+    for low_1, high_1, low_2, high_2, d in (
+        (start_1.left, start_1.right, start_2.left, start_2.right, dx),
+        (start_1.top, start_1.bottom, start_2.top, start_2.bottom, dy),
+    ):
+        if d == 0:
+            if high_1 < low_2 or high_2 < low_1:
+                return None
+            continue
+        t_1, t_2 = (low_2 - high_1) / d, (high_2 - low_1) / d
+        entry = max(entry, min(t_1, t_2))
+        exit = min(exit, max(t_1, t_2))
+        if entry > exit:
+            return None
+    return entry
@@ -1,151 +1,610 @@
-from abc import abstractmethod
-from typing import Literal
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil, hypot, inf
+from typing import Iterable, Literal
 
-from ..utils import Pos, insertion_sort
-from .collidable import Collidable
+import numpy as np
+
+from ..utils import BodyType, FrameProfiler, Pos, Rect
+from .broad_phase import (
+    BroadPhase,
+    DynamicAABBTree,
+    IncrementalSweepAndPrune,
+    SpatialHashGrid,
+    SweepAndPrune,
+)
+from .collidable import ALL_CATEGORIES, Collidable
 from .collider import Collider
-from .collision import Collision, PreCollision
-from .collision_detection.collision_detector import CollisionDetector
+from .collider_store import ColliderStore
+from .colliders import PolygonCollider, RectCollider
+from .collision import (
+    Collision,
+    CollisionEvents,
+    ContinuousCollision,
+    PreCollision,
+    RaycastHit,
+    ShapeCastHit,
+)
+from .collision_detection import (
+    CollisionDetector,
+    GJKWarmStartCache,
+    batched_gjk_search_2d,
+    gjk_time_of_impact,
+    ray_collider_intersection,
+    swept_aabb_time_of_impact,
+)
 
+BroadPhaseType = Literal["sap", "incremental_sap", "grid", "tree"]
 
-class _Vertice2D:
 
-    def __init__(self, collidable: Collidable, collider: Collider, is_initial: bool):
-        super().__init__()
-        self.is_initial = is_initial
-        self.collidable = collidable
-        self.collider = collider
+class CollisionManager2D:
+    """
+    Every collider registered in the manager gets an integer handle in
+    store, which keeps the bounding boxes of all colliders in contiguous
+    arrays refreshed once per frame by update. The last GJK direction and
+    simplex of each candidate pair are cached to warm start GJK on the
+    next frame. Pairs of polygons small enough for the separating axis
+    test (see CollisionDetector.SAT_MAX_VERTICES) do not use the cache
+    when tested one by one, since SAT needs no search direction.
 
-    @property
-    @abstractmethod
-    def value(self) -> int:
-        pass
+    broad_phase selects how candidate pairs are found:
+        "sap": sorts both axes and sweeps them from scratch every frame.
+        "incremental_sap": keeps both axes sorted with insertion_sort and
+            updates a persistent set of pairs only when endpoints swap.
+        "grid": a uniform spatial hash grid with cells of side cell_size.
+        "tree": a dynamic AABB tree whose leaves are the bounding boxes
+            enlarged by fat_margin and stretched along their motion. It
+            also speeds up query_rect, query_point, raycast, raycast_batch
+            and shape_cast, which the other backends answer by scanning.
 
+    If pull_bounds is False, update does not read the bounding rect of
+    every collider. Instead, collidables push their own bounds when they
+    move with refresh_collidable, for instance by setting it as the
+    transform_hook of an Entity, or an EntityWorld writes them.
 
-class _YInitialVertice2D(_Vertice2D):
-    def __init__(self, collidable: Collidable, collider: Collider):
-        super().__init__(collidable, collider, True)
+    Collidables with continuous_collision set (or set_continuous) cannot
+    tunnel through other colliders when they move fast. Their boxes in
+    the broad phase cover their motion during the frame, and their pairs
+    are reported as ContinuousCollision, with the time of impact given
+    by the swept bounding rects for rects, and by gjk_time_of_impact on
+    the relative motion for other polygons, which are only reported if
+    their shapes actually touch during the frame.
 
-    @property
-    def value(self) -> int:
-        rect = self.collider.bounding_rect
-        return rect.y
+    If narrow_phase_workers is above 0, frames with at least
+    parallel_min_pairs GJK pairs split them in one chunk per worker and
+    test the chunks on a thread pool. The points of the polygons are moved
+    into store.vertices once, in the calling thread, and each worker only
+    gets a slice of the pair handles, gathering its polygons from
+    store.vertices in NumPy, which releases the GIL in its loops. Call
+    close to stop the workers.
+    """
 
+    # Fewer GJK pairs are tested one by one, which is faster than gathering
+    # them for batched_gjk_search_2d (measured with 20 x 20 polygons)
+    BATCHED_GJK_MIN_PAIRS = 96
 
-class _YFinalVertice2D(_Vertice2D):
-    def __init__(self, collidable: Collidable, collider: Collider):
-        super().__init__(collidable, collider, False)
+    def __init__(
+        self,
+        broad_phase: BroadPhaseType = "sap",
+        cell_size: int = 32,
+        fat_margin: float = 4.0,
+        pull_bounds: bool = True,
+        narrow_phase_workers: int = 0,
+        parallel_min_pairs: int = 1024,
+    ):
+        self.active_objs: set[Collidable] = set()
+        self.store = ColliderStore()
+        self.broad_phase_backend = self._create_broad_phase(
+            broad_phase, cell_size, fat_margin
+        )
+        self.gjk_cache = GJKWarmStartCache()
+        self.pull_bounds = pull_bounds
+        self.profiler = FrameProfiler()
+        self._previous_collisions: dict[tuple[Collider, Collider], Collision] = {}
+        self.narrow_phase_workers = narrow_phase_workers
+        self.parallel_min_pairs = parallel_min_pairs
+        self._executor = (
+            ThreadPoolExecutor(narrow_phase_workers, "narrow_phase")
+            if narrow_phase_workers > 0
+            else None
+        )
 
-    @property
-    def value(self) -> int:
-        rect = self.collider.bounding_rect
-        return rect.y + rect.height
+    def close(self):
+        """Stops the narrow phase workers, if there are any"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
 
+    def update(self):
+        profiler = self.profiler
+        if self.pull_bounds:
+            with profiler.scope("collision.refresh_bounds"):
+                self.store.refresh_bounds()
+        self.store.update_sweeps()
+        with profiler.scope("collision.broad_phase_update"):
+            self.broad_phase_backend.update()
 
-class _XInitialVertice2D(_Vertice2D):
-    def __init__(self, collidable: Collidable, collider: Collider):
-        super().__init__(collidable, collider, True)
+    def refresh_collidable(self, obj: Collidable):
+        """Reads the bounds of the colliders of obj, which just moved"""
+        if obj in self.store.obj_handles:
+            self.store.refresh_handles(self.store.obj_handles[obj])
 
-    @property
-    def value(self) -> int:
-        rect = self.collider.bounding_rect
-        return rect.x
+    def add_collidables(self, objs: Iterable[Collidable]):
+        """
+        Registers all objs and then hands all their handles to the broad
+        phase at once, so sweep-and-prune sorts the new endpoints once.
+        """
+        handles: list[int] = []
+        for obj in objs:
+            obj_handles = self.store.add(obj)
+            if obj.continuous_collision:
+                self.store.continuous.update(obj_handles)
+            handles.extend(obj_handles)
+            self.active_objs.add(obj)
+        self.broad_phase_backend.add(handles)
 
+    def remove_collidables(self, objs: Iterable[Collidable]):
+        handles: list[int] = []
+        for obj in objs:
+            handles.extend(self.store.remove(obj))
+            self.active_objs.remove(obj)
+        self.broad_phase_backend.remove(handles)
+        self.gjk_cache.forget(handles)
 
-class _XFinalVertice2D(_Vertice2D):
-    def __init__(self, collidable: Collidable, collider: Collider):
-        super().__init__(collidable, collider, False)
+    def add_collidable(self, obj: Collidable):
+        self.add_collidables((obj,))
 
-    @property
-    def value(self) -> int:
-        rect = self.collider.bounding_rect
-        return rect.x + rect.width
+    def set_continuous(self, obj: Collidable, continuous: bool = True):
+        """Turns continuous collision detection on or off for obj"""
+        obj.continuous_collision = continuous
+        handles = self.store.obj_handles[obj]
+        if continuous:
+            self.store.continuous.update(handles)
+            return
+        self.store.continuous.difference_update(handles)
+        for handle in handles:
+            self.store.sweeps.pop(handle, None)
 
+    def remove_collidable(self, obj: Collidable):
+        self.remove_collidables((obj,))
 
-class CollisionManager2D:
-    def __init__(self) -> None:
-        self.objs_to_remove: set[Collidable] = set()
-        self.active_objs: set[Collidable] = set()
-        self.x_sorted: list[_Vertice2D] = []
-        self.y_sorted: list[_Vertice2D] = []
+    def set_collision_filter(self, obj: Collidable, category: int, mask: int):
+        """
+        obj only collides with the collidables whose category has a bit in
+        common with mask, and whose mask has a bit in common with category.
+        """
+        obj.collision_category, obj.collision_mask = category, mask
+        handles = self.store.obj_handles[obj]
+        self.store.set_filter(handles, category, mask)
+        self.broad_phase_backend.refilter(handles)
 
-    def update(self):
-        self.sort_on_x()
-        self.sort_on_y()
+    def set_body_type(self, obj: Collidable, body_type: BodyType):
+        """
+        Only pairs with at least one dynamic collidable are reported. Static
+        ones are assumed not to move, so sweep-and-prune only sorts them
+        when static collidables are added or removed.
+        """
+        obj.body_type = body_type
+        handles = self.store.obj_handles[obj]
+        self.store.set_body_type(handles, body_type)
+        self.broad_phase_backend.refilter(handles)
 
-    def add_collidables(self, objs: frozenset[Collidable]):
-        for obj in objs:
-            self.add_collidable(obj)
+    def get_collisions(self) -> set[Collision]:
+        profiler = self.profiler
+        with profiler.scope("collision.broad_phase_pairs"):
+            pairs = self.broad_phase_backend.pairs()
+        profiler.count("collision.pairs_tested", len(pairs))
+        self.gjk_cache.retain(pairs)
+        with profiler.scope("collision.narrow_phase"):
+            collisions = self._narrow_phase(pairs)
+        profiler.count("collision.collisions", len(collisions))
+        return collisions
 
-    def remove_collidables(self, objs: frozenset[Collidable]):
-        for obj in objs:
-            self.remove_collidable(obj)
+    def get_collision_events(self) -> CollisionEvents:
+        """
+        Same as get_collisions, but compared with the collisions found by
+        the previous call. Calls on_collision_begin, on_collision_stay and
+        on_collision_end on both collidables of every collision.
+        """
+        previous = self._previous_collisions
+        current = {(c.collider_1, c.collider_2): c for c in self.get_collisions()}
+        began = {c for key, c in current.items() if key not in previous}
+        stayed = {c for key, c in current.items() if key in previous}
+        ended = {c for key, c in previous.items() if key not in current}
+        self._previous_collisions = current
+        for collision in began:
+            collision.obj_1.on_collision_begin(collision)
+            collision.obj_2.on_collision_begin(collision)
+        for collision in stayed:
+            collision.obj_1.on_collision_stay(collision)
+            collision.obj_2.on_collision_stay(collision)
+        for collision in ended:
+            collision.obj_1.on_collision_end(collision)
+            collision.obj_2.on_collision_end(collision)
+        return CollisionEvents(began=began, stayed=stayed, ended=ended)
 
-    def add_collidable(self, obj: Collidable):
-        for collider in obj.get_colliders():
-            self.x_sorted.append(_XInitialVertice2D(obj, collider))
-            self.x_sorted.append(_XFinalVertice2D(obj, collider))
-            self.y_sorted.append(_YInitialVertice2D(obj, collider))
-            self.y_sorted.append(_YFinalVertice2D(obj, collider))
-        self.active_objs.add(obj)
-        self.update()
+    def broad_phase(self) -> set[PreCollision]:
+        return {
+            self._pre_collision(h1, h2) for h1, h2 in self.broad_phase_backend.pairs()
+        }
 
-    def remove_collidable(self, obj: Collidable):
-        self.objs_to_remove.add(obj)
-        self.active_objs.remove(obj)
+    def query_rect(self, rect: Rect) -> set[Collidable]:
+        """Collidables with a collider whose bounding rect overlaps rect"""
+        handles = self.broad_phase_backend.query(
+            rect.left, rect.top, rect.right, rect.bottom
+        )
+        return {self._entry(handle)[0] for handle in handles}
 
-    def get_collisions(self) -> set[Collision]:
-        return self.narrow_phase(self.broad_phase())
+    def query_point(self, pos: Pos) -> set[Collidable]:
+        """Collidables with a collider that contains pos"""
+        handles = self.broad_phase_backend.query(pos.x, pos.y, pos.x, pos.y)
+        found = set()
+        for handle in handles:
+            obj, collider = self._entry(handle)
+            if collider.point_collision(pos):
+                found.add(obj)
+        return found
 
-    def broad_phase(self) -> set[PreCollision]:
-        colliding_in_x = self.broad_phase_in_axis("x")
-        colliding_in_y = self.broad_phase_in_axis("y")
-        intersection = colliding_in_x.intersection(colliding_in_y)
-        self.objs_to_remove = set()
-        return intersection
-
-    def broad_phase_in_axis(self, axis: Literal["x", "y"]) -> set[PreCollision]:
-        """Implements the sweep-and-prune algorithm for one axis"""
-        vertices = self.x_sorted if axis == "x" else self.y_sorted
-        pre_collisions: set[PreCollision] = set()
-        touching_objs: set[tuple[Collidable, Collider]] = set()
-        vertices_to_remove: set[_Vertice2D] = set()
-        for vertice in vertices:
-            obj_1 = vertice.collidable
-            collider_1 = vertice.collider
-            if obj_1 in self.objs_to_remove:
-                vertices_to_remove.add(vertice)
+    def query_points(self, points: np.ndarray) -> list[set[Collidable]]:
+        """
+        Vectorized query_point for an M x 2 array of points. All points are
+        tested against all bounding boxes at once, and each collider then
+        tests the points inside its box with points_collision.
+        """
+        found: list[set[Collidable]] = [set() for _ in range(len(points))]
+        store = self.store
+        handles = store.live_handles()
+        x, y = points[:, 0:1], points[:, 1:2]
+        inside = (
+            (store.min_x[handles] <= x)
+            & (x <= store.max_x[handles])
+            & (store.min_y[handles] <= y)
+            & (y <= store.max_y[handles])
+        )
+        rows, columns = np.nonzero(inside)
+        order = np.argsort(columns, kind="stable")
+        rows, columns = rows[order], columns[order]
+        # Candidate points of the same collider are contiguous
+        starts = np.flatnonzero(np.diff(columns, prepend=-1)).tolist()
+        for start, end in zip(starts, starts[1:] + [len(columns)]):
+            obj, collider = self._entry(int(handles[columns[start]]))
+            candidates = rows[start:end]
+            for row in candidates[collider.points_collision(points[candidates])]:
+                found[row].add(obj)
+        return found
+
+    def raycast(
+        self,
+        origin: Pos,
+        direction: Pos,
+        max_distance: float = inf,
+        mask: int = ALL_CATEGORIES,
+    ) -> list[RaycastHit]:
+        """
+        Colliders hit by the ray from origin towards direction within
+        max_distance, closest first. Only colliders whose category has a bit
+        in common with mask are hit. The broad phase finds the bounding
+        boxes the ray enters (see BroadPhase.query_rays), and the ray is
+        only tested against the shapes of their colliders.
+        """
+        length = hypot(*direction)
+        assert length > 0
+        direction = Pos(direction.x / length, direction.y / length)
+        return self._raycast_batch(
+            np.array([origin], dtype=np.float64),
+            np.array([direction], dtype=np.float64),
+            max_distance,
+            mask,
+        )[0]
+
+    def raycast_batch(
+        self,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        max_distance: float = inf,
+        mask: int = ALL_CATEGORIES,
+    ) -> list[list[RaycastHit]]:
+        """
+        raycast for M rays at once, given as M x 2 arrays of origins and
+        directions, such as for line of sight checks. The broad phase finds
+        the bounding boxes each ray enters, all at once for the backends
+        that scan, or by walking the tree along each ray.
+        """
+        lengths = np.hypot(directions[:, 0], directions[:, 1])
+        assert np.all(lengths > 0)
+        return self._raycast_batch(
+            origins.astype(np.float64),
+            directions / lengths[:, None],
+            max_distance,
+            mask,
+        )
+
+    def shape_cast(
+        self, collider: Collider, motion: Pos, mask: int = ALL_CATEGORIES
+    ) -> list[ShapeCastHit]:
+        """
+        Colliders hit by collider when it moves by motion from where it is,
+        earliest first. The colliders of the collidable of collider, if it
+        is registered, are never hit. Bounding boxes that do not meet during
+        the motion are skipped, and the time of impact of the others is
+        found with GJK (see gjk_time_of_impact).
+        """
+        store = self.store
+        start = collider.bounding_rect
+        end = Rect.move(start, motion)
+        handles = self.broad_phase_backend.query(
+            min(start.left, end.left),
+            min(start.top, end.top),
+            max(start.right, end.right),
+            max(start.bottom, end.bottom),
+        )
+        caster = None
+        if collider in store.collider_handles:
+            caster = store.objs[store.collider_handles[collider]]
+        points = self._shape_points(collider)
+        hits = []
+        for handle in handles:
+            if not store.categories[handle] & mask:
+                continue
+            obj, other = self._entry(handle)
+            if obj is caster:
                 continue
-            if not vertice.is_initial:
-                touching_objs.remove((obj_1, collider_1))
+            rect = other.bounding_rect
+            earliest = swept_aabb_time_of_impact(start, end, rect, rect)
+            if earliest is None:
                 continue
-            for obj_2, collider_2 in touching_objs:
-                if obj_1 == obj_2:
-                    continue
-                pre_collisions.add(
-                    PreCollision(
-                        obj_1=obj_1,
-                        collider_1=collider_1,
-                        obj_2=obj_2,
-                        collider_2=collider_2,
-                    )
+            time_of_impact = gjk_time_of_impact(
+                points, motion, self._shape_points(other), earliest
+            )
+            if time_of_impact is not None:
+                hits.append(
+                    ShapeCastHit(obj=obj, collider=other, time_of_impact=time_of_impact)
                 )
-            touching_objs.add((obj_1, collider_1))
-        for vertice in vertices_to_remove:
-            vertices.remove(vertice)
-        return pre_collisions
+        hits.sort(key=lambda hit: hit.time_of_impact)
+        return hits
+
+    def _raycast_batch(
+        self,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        max_distance: float,
+        mask: int,
+    ) -> list[list[RaycastHit]]:
+        """
+        Tests the rays (with unit directions) against the colliders whose
+        bounding box the broad phase finds they enter, if their category
+        has a bit in common with mask.
+        """
+        rays, handles = self.broad_phase_backend.query_rays(
+            origins, directions, max_distance
+        )
+        keep = (self.store.categories[handles] & mask) != 0
+        hits: list[list[RaycastHit]] = [[] for _ in range(len(origins))]
+        for ray, handle in zip(rays[keep].tolist(), handles[keep].tolist()):
+            origin, direction = Pos(*origins[ray]), Pos(*directions[ray])
+            obj, collider = self._entry(handle)
+            intersection = ray_collider_intersection(
+                origin, direction, collider, max_distance
+            )
+            if intersection is None:
+                continue
+            distance, normal = intersection
+            point = Pos(
+                origin.x + direction.x * distance,
+                origin.y + direction.y * distance,
+            )
+            hits[ray].append(
+                RaycastHit(
+                    obj=obj,
+                    collider=collider,
+                    distance=distance,
+                    point=point,
+                    normal=normal,
+                )
+            )
+        for ray_hits in hits:
+            ray_hits.sort(key=lambda hit: hit.distance)
+        return hits
 
     def narrow_phase(self, pre_collisions: set[PreCollision]) -> set[Collision]:
+        handles = self.store.collider_handles
+        pairs = ((handles[p.collider_1], handles[p.collider_2]) for p in pre_collisions)
+        return self._narrow_phase((min(pair), max(pair)) for pair in pairs)
+
+    def _narrow_phase(self, pairs: Iterable[tuple[int, int]]) -> set[Collision]:
+        """
+        Pairs resolved by GJK are gathered and, if there are at least
+        BATCHED_GJK_MIN_PAIRS of them, tested all at once with
+        batched_gjk_search_2d, warm started from gjk_cache, and only the
+        colliding ones compute their minimal translation vector. Otherwise
+        they are tested one by one, with the separating axis test if they
+        are small enough, or GJK warm started from the direction cached in
+        gjk_cache. Pairs of other kernels are always tested one by one.
+        Assumes each pair has its smallest handle first.
+        """
+        colliders = self.store.colliders
+        continuous = self.store.continuous
         collisions: set[Collision] = set()
-        for pre_collision in pre_collisions:
-            collider_1 = pre_collision.collider_1
-            collider_2 = pre_collision.collider_2
-            if vector := CollisionDetector.collide(collider_1, collider_2):
-                collisions.add(Collision.from_pre_collision(pre_collision, vector))
+        gjk_pairs: list[tuple[int, int]] = []
+        for handle_1, handle_2 in pairs:
+            _, collider_1 = self._entry(handle_1)
+            _, collider_2 = self._entry(handle_2)
+            if continuous and (handle_1 in continuous or handle_2 in continuous):
+                if collision := self._continuous_collision(handle_1, handle_2):
+                    collisions.add(collision)
+            elif CollisionDetector.uses_gjk(collider_1, collider_2):
+                gjk_pairs.append((handle_1, handle_2))
+            elif vector := CollisionDetector.collide(collider_1, collider_2):
+                collisions.add(self._collision(handle_1, handle_2, vector))
+        if len(gjk_pairs) < self.BATCHED_GJK_MIN_PAIRS:
+            # Gathering the polygons costs more than the scalar kernels save
+            for handle_1, handle_2 in gjk_pairs:
+                vector = self._polygon_collision(handle_1, handle_2)
+                if vector is not None:
+                    collisions.add(self._collision(handle_1, handle_2, vector))
+            return collisions
+        self.profiler.count("collision.gjk_pairs", len(gjk_pairs))
+        handles = np.array(gjk_pairs, dtype=np.int64)
+        self.store.refresh_vertices(np.unique(handles))
+        seeds = self.gjk_cache.seeds(gjk_pairs)
+        if self._executor is None or len(gjk_pairs) < self.parallel_min_pairs:
+            collided, directions, simplices = self._gjk_chunk(handles, *seeds)
+        else:
+            collided, directions, simplices = self._parallel_gjk(handles, *seeds)
+        self.gjk_cache.store(gjk_pairs, directions, simplices)
+        for (handle_1, handle_2), hit in zip(gjk_pairs, collided):
+            if hit:
+                vector = CollisionDetector.minimal_translation_vector(
+                    self._as_polygon(colliders[handle_1]),
+                    self._as_polygon(colliders[handle_2]),
+                )
+                collisions.add(self._collision(handle_1, handle_2, vector))
         return collisions
 
-    def sort_on_x(self):
-        insertion_sort(self.x_sorted, size=(lambda v: v.value))
+    def _polygon_collision(self, handle_1: int, handle_2: int) -> Pos | None:
+        """CollisionDetector.collide, with GJK warm started from gjk_cache"""
+        polygon_1 = self._as_polygon(self.store.colliders[handle_1])
+        polygon_2 = self._as_polygon(self.store.colliders[handle_2])
+        if CollisionDetector.is_small(polygon_1, polygon_2):
+            return CollisionDetector.collide(polygon_1, polygon_2)
+        pair = (handle_1, handle_2)
+        collided, direction = CollisionDetector.gjk_search(
+            polygon_1, polygon_2, self.gjk_cache.direction(pair)
+        )
+        # The last direction of a hit is a poor seed, so hits start cold
+        self.gjk_cache.store_direction(pair, (0.0, 0.0) if collided else direction)
+        return Pos(0, 0) if collided else None
+
+    def _gjk_chunk(
+        self, handles: np.ndarray, directions: np.ndarray, simplices: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Runs batched_gjk_search_2d on the pairs of handles (a P x 2 array),
+        gathering their points from store.vertices, which refresh_vertices
+        has to have moved already. The points are only as wide as the
+        largest polygon of the chunk.
+        """
+        vertices, counts = self.store.vertices, self.store.vertex_counts
+        handles_1, handles_2 = handles[:, 0], handles[:, 1]
+        polys1 = vertices[handles_1, : counts[handles_1].max()]
+        polys2 = vertices[handles_2, : counts[handles_2].max()]
+        return batched_gjk_search_2d(polys1, polys2, directions, simplices)
+
+    def _parallel_gjk(
+        self, handles: np.ndarray, directions: np.ndarray, simplices: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Same as _gjk_chunk, with one chunk of the pairs per worker"""
+        assert self._executor is not None
+        size = ceil(len(handles) / self.narrow_phase_workers)
+        futures = [
+            self._executor.submit(
+                self._gjk_chunk,
+                handles[start : start + size],
+                directions[start : start + size],
+                simplices[start : start + size],
+            )
+            for start in range(0, len(handles), size)
+        ]
+        results = [future.result() for future in futures]
+        collided, directions, simplices = (
+            np.concatenate(parts) for parts in zip(*results)
+        )
+        return collided, directions, simplices
+
+    def _continuous_collision(
+        self, handle_1: int, handle_2: int
+    ) -> ContinuousCollision | None:
+        sweep_1, sweep_2 = self._sweep(handle_1), self._sweep(handle_2)
+        time_of_impact = swept_aabb_time_of_impact(*sweep_1, *sweep_2)
+        if time_of_impact is None:
+            return None
+        obj_1, collider_1 = self._entry(handle_1)
+        obj_2, collider_2 = self._entry(handle_2)
+        (start_1, end_1), (start_2, end_2) = sweep_1, sweep_2
+        motion_1 = Pos(end_1.x - start_1.x, end_1.y - start_1.y)
+        motion_2 = Pos(end_2.x - start_2.x, end_2.y - start_2.y)
+        motion = Pos.sub(motion_1, motion_2)
+        if not (
+            isinstance(collider_1, RectCollider)
+            and isinstance(collider_2, RectCollider)
+        ):
+            # The boxes are exact for rects only, other shapes may not touch
+            time_of_impact = gjk_time_of_impact(
+                [Pos.sub(p, motion_1) for p in self._shape_points(collider_1)],
+                motion,
+                [Pos.sub(p, motion_2) for p in self._shape_points(collider_2)],
+                time_of_impact,
+            )
+            if time_of_impact is None:
+                return None
+        vector = CollisionDetector.collide(collider_1, collider_2)
+        if vector is None:
+            # They touched during the frame, obj_1 goes back to that moment
+            vector = Pos.mul(motion, time_of_impact - 1)
+        return ContinuousCollision(
+            obj_1=obj_1,
+            collider_1=collider_1,
+            obj_2=obj_2,
+            collider_2=collider_2,
+            minimal_translation_vector=vector,
+            time_of_impact=time_of_impact,
+        )
+
+    def _sweep(self, handle: int) -> tuple[Rect, Rect]:
+        """Bounding rects of a collider at the start and end of the frame"""
+        if handle in self.store.sweeps:
+            return self.store.sweeps[handle]
+        _, collider = self._entry(handle)
+        return collider.bounding_rect, collider.bounding_rect
+
+    def _create_broad_phase(
+        self, broad_phase: BroadPhaseType, cell_size: int, fat_margin: float
+    ) -> BroadPhase:
+        match broad_phase:
+            case "sap":
+                return SweepAndPrune(self.store)
+            case "incremental_sap":
+                return IncrementalSweepAndPrune(self.store)
+            case "grid":
+                return SpatialHashGrid(self.store, cell_size)
+            case "tree":
+                return DynamicAABBTree(self.store, fat_margin)
+            case _:
+                raise ValueError(f"Unknown broad phase: {broad_phase}")
+
+    def _entry(self, handle: int) -> tuple[Collidable, Collider]:
+        """The collidable and collider of handle, moved to where it is"""
+        obj, collider = self.store.objs[handle], self.store.colliders[handle]
+        assert obj is not None and collider is not None
+        obj.sync_transform()
+        return obj, collider
+
+    def _pre_collision(self, handle_1: int, handle_2: int) -> PreCollision:
+        obj_1, collider_1 = self._entry(handle_1)
+        obj_2, collider_2 = self._entry(handle_2)
+        return PreCollision(
+            obj_1=obj_1, collider_1=collider_1, obj_2=obj_2, collider_2=collider_2
+        )
+
+    def _collision(self, handle_1: int, handle_2: int, vector: Pos) -> Collision:
+        obj_1, collider_1 = self._entry(handle_1)
+        obj_2, collider_2 = self._entry(handle_2)
+        return Collision(
+            obj_1=obj_1,
+            collider_1=collider_1,
+            obj_2=obj_2,
+            collider_2=collider_2,
+            minimal_translation_vector=vector,
+        )
+
+    @staticmethod
+    def _shape_points(collider: Collider) -> list[Pos]:
+        """The points of a polygon, or the corners of its bounding rect"""
+        if isinstance(collider, PolygonCollider):
+            return collider.points
+        rect = collider.bounding_rect
+        return [rect.top_left, rect.top_right, rect.bottom_right, rect.bottom_left]
 
-    def sort_on_y(self):
-        insertion_sort(self.y_sorted, size=(lambda v: v.value))
+    @staticmethod
+    def _as_polygon(collider: Collider) -> PolygonCollider:
+        assert isinstance(collider, PolygonCollider)
+        return collider
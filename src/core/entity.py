@@ -1,11 +1,15 @@
 from time import time
+from typing import TYPE_CHECKING, Callable
 
 import pygame
 from pygame.event import Event
 from pygame.surface import Surface
 
 from .collision import Collidable, Collider, CollisionDetector
-from .utils import ClickState, MouseButtons, Pos
+from .utils import ClickState, MouseButtons, Pos, Rect
+
+if TYPE_CHECKING:
+    from .entity_world import EntityWorld
 
 
 class Entity(Collidable):
@@ -26,33 +30,111 @@ class Entity(Collidable):
             button: None for button in MouseButtons
         }
         self._double_click_time = 0.5
+        # The colliders are only moved to the position when it changes
+        self._transform_dirty = True
+        self.transform_hook: Callable[["Entity"], None] | None = None
+        # Set by a PointerDispatcher, which then handles the mouse instead
+        self.pointer_managed = False
+        self.layer = 0  # Entities on higher layers are drawn on top
+        # What the entity last drew and where, see pop_dirty_rects
+        self._screen_surfaces: list[tuple[Surface, Pos]] = []
+        self._screen_rects: list[Rect] = []
+        # Set by an EntityWorld, which then keeps the kinematics in a row
+        self._world: "EntityWorld | None" = None
+        self._world_row = -1
 
     def get_surface(self) -> tuple[Surface, Pos]:
         raise NotImplementedError()
 
+    def get_surfaces(self) -> list[tuple[Surface, Pos]]:
+        """Everything the entity draws, such as itself and its bullets"""
+        return [self.get_surface()]
+
     def _get_colliders(self) -> set[Collider]:
         raise NotImplementedError()
 
+    @property
+    def screen_surfaces(self) -> list[tuple[Surface, Pos]]:
+        """The surfaces the entity was last drawn with, see pop_dirty_rects"""
+        return self._screen_surfaces
+
+    @property
+    def screen_rects(self) -> list[Rect]:
+        """The regions of the screen covered by each of screen_surfaces"""
+        return self._screen_rects
+
+    def pop_dirty_rects(self) -> list[Rect]:
+        """
+        If any of the surfaces of the entity moved or changed since the last
+        call, returns the regions of the screen it was and is now drawn on,
+        which have to be redrawn. Otherwise returns an empty list.
+        """
+        surfaces = self.get_surfaces()
+        rects = [
+            Rect(pos.x, pos.y, surface.get_width(), surface.get_height())
+            for surface, pos in surfaces
+        ]
+        old_surfaces = self._screen_surfaces
+        if (
+            rects == self._screen_rects
+            and len(surfaces) == len(old_surfaces)
+            and all(new[0] is old[0] for new, old in zip(surfaces, old_surfaces))
+        ):
+            return []
+        dirty = self._screen_rects + rects
+        self._screen_surfaces, self._screen_rects = surfaces, rects
+        return dirty
+
+    def mark_render_dirty(self):
+        """Tells pop_dirty_rects that the surfaces were drawn on in place"""
+        self._screen_surfaces = []
+
     def get_colliders(self) -> set[Collider]:
-        colliders = self._get_colliders()
-        for collider in colliders:
+        self.sync_transform()
+        return self._get_colliders()
+
+    def sync_transform(self):
+        """
+        Moves the colliders to the position if it changed since the last
+        call, and then calls transform_hook, which can be set to push the
+        new bounds to a collision manager (see refresh_collidable).
+        """
+        world = self._world
+        if world is not None and world.dirty[self._world_row]:
+            world.dirty[self._world_row] = False
+            self._transform_dirty = True
+        if not self._transform_dirty:
+            return
+        self._transform_dirty = False
+        for collider in self._get_colliders():
             collider.set_position(self.position)
-        return colliders
+        if self.transform_hook is not None:
+            self.transform_hook(self)
 
     def update(self):
-        mouse_pos = Pos(*pygame.mouse.get_pos())
-        if not self.point_collision(mouse_pos):
-            self.reset_all_mouse_button_states()
-        else:
-            self._handle_hover()
+        if not self.pointer_managed:
+            mouse_pos = Pos(*pygame.mouse.get_pos())
+            if not self.point_collision(mouse_pos):
+                self.reset_all_mouse_button_states()
+            else:
+                self.handle_pointer_hover()
+        if self._world is not None:
+            return  # The world moves the entity, see EntityWorld.step
         self.move(self.velocity)
         self.accelerate(self.acceleration)
+        self.sync_transform()
 
     def on_event(self, event: Event) -> None:
+        if self.pointer_managed:
+            return
         mouse_pos = Pos(*pygame.mouse.get_pos())
         if not self.point_collision(mouse_pos):
             self.reset_all_mouse_button_states()
             return
+        self.handle_pointer_event(event)
+
+    def handle_pointer_event(self, event: Event):
+        """This function assumes the mouse has collided"""
         match event.type:
             case pygame.MOUSEBUTTONDOWN:
                 event_button = MouseButtons(event.button)
@@ -66,40 +148,61 @@ class Entity(Collidable):
 
     @property
     def position(self) -> Pos:
+        if self._world is not None:
+            return self._world.position(self._world_row)
         return self._position
 
     @property
     def velocity(self) -> Pos:
+        if self._world is not None:
+            return self._world.velocity(self._world_row)
         return self._velocity
 
     @property
     def acceleration(self) -> Pos:
+        if self._world is not None:
+            return self._world.acceleration(self._world_row)
         return self._acceleration
 
     def set_position(self, pos: Pos):
-        difference = Pos.sub(pos, self._position)
+        difference = Pos.sub(pos, self.position)
         self.move(difference)
 
     def set_velocity_in_seconds(self, vel: Pos):
         """The input is assumed to be in pixels per second"""
-        self._velocity = Pos(vel.x // self.fps, vel.y // self.fps)
+        self.set_velocity_in_frames(Pos(vel.x / self.fps, vel.y / self.fps))
 
     def set_velocity_in_frames(self, vel: Pos):
         """The input is assumed to be in pixels per frame"""
+        if self._world is not None:
+            self._world.velocities[self._world_row] = vel
+            return
         self._velocity = vel
 
     def set_acceleration_in_seconds(self, acc: Pos):
         """The input is assumed to be in pixels per second squared"""
-        self._acceleration = Pos(acc.x // self.fps**2, acc.y // self.fps**2)
+        self.set_acceleration_in_frames(Pos(acc.x / self.fps**2, acc.y / self.fps**2))
 
     def set_acceleration_in_frames(self, acc: Pos):
         """The input is assumed to be in pixels per frame squared"""
+        if self._world is not None:
+            self._world.accelerations[self._world_row] = acc
+            return
         self._acceleration = acc
 
     def move(self, vector: Pos):
+        if vector.x == 0 and vector.y == 0:
+            return
+        if self._world is not None:
+            self._world.move(self._world_row, vector)
+            return
         self._position = Pos.add(self._position, vector)
+        self._transform_dirty = True
 
     def accelerate(self, vector: Pos):
+        if self._world is not None:
+            self._world.velocities[self._world_row] += vector
+            return
         self._velocity = Pos.add(self._velocity, vector)
 
     def _handle_mouse_button_down(self, button: MouseButtons):
@@ -122,7 +225,7 @@ class Entity(Collidable):
             self.set_mouse_button_state(button, ClickState.CLICKED)
             self._last_click_time_dict[button] = time()
 
-    def _handle_hover(self):
+    def handle_pointer_hover(self):
         """This function assumes the mouse has collided"""
         for button in MouseButtons:
             if self.is_mouse_button_pressed(button):
@@ -135,9 +238,7 @@ class Entity(Collidable):
         return time() - previous_time < self._double_click_time
 
     def reset_all_mouse_button_states(self):
-        self._mouse_button_state_dict = {
-            button: ClickState.IDLE for button in MouseButtons
-        }
+        self._mouse_button_state_dict = dict.fromkeys(MouseButtons, ClickState.IDLE)
 
     def set_mouse_button_state(self, button: MouseButtons, state: ClickState):
         self._mouse_button_state_dict[button] = state
@@ -0,0 +1,176 @@
+from typing import Iterable
+
+import numpy as np
+
+from .collision import CollisionManager2D
+from .entity import Entity
+from .utils import Pos, RectArray, Vec2Array
+
+
+class EntityWorld:
+    """
+    Keeps the position, velocity and acceleration of the registered
+    entities in the rows of N x 2 arrays, and moves all of them at once in
+    step, instead of one move and one accelerate per entity. The entities
+    read and write their row, so Entity.position and the setters keep
+    working, and Entity.update no longer moves them.
+
+    Colliders are only moved when they are read (see Entity.sync_transform),
+    so code reading a collider directly has to call sync_transform first.
+    If collision_manager is given, step also writes the new bounding boxes
+    of the entities' colliders to its store, so collision_manager has to
+    be created with pull_bounds set to False, and the entities have to be
+    added to it before being added to the world.
+
+        world = EntityWorld(collision_manager)
+        world.add_entities(entities)
+        world.step()  # Once per frame, instead of moving each entity
+    """
+
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, collision_manager: CollisionManager2D | None = None):
+        if collision_manager is not None and collision_manager.pull_bounds:
+            raise ValueError("The collision manager must not pull bounds")
+        self.collision_manager = collision_manager
+        self.entities: list[Entity] = []
+        self.positions = np.zeros((self.INITIAL_CAPACITY, 2))
+        self.velocities = np.zeros((self.INITIAL_CAPACITY, 2))
+        self.accelerations = np.zeros((self.INITIAL_CAPACITY, 2))
+        # Rows whose colliders were not moved since the row last moved
+        self.dirty = np.zeros(self.INITIAL_CAPACITY, dtype=bool)
+        # For each collider handle, the row of its entity and its bounding
+        # box relative to the position of the entity
+        self._handles = np.empty(0, dtype=np.int64)
+        self._handle_rows = np.empty(0, dtype=np.int64)
+        self._offsets = np.empty((0, 4))
+        self._handles_outdated = False
+        self._handles_version = -1
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def add_entities(self, entities: Iterable[Entity]):
+        for entity in entities:
+            assert entity._world is None
+            row = len(self.entities)
+            self._ensure_capacity(row + 1)
+            self.entities.append(entity)
+            self.positions[row] = entity.position
+            self.velocities[row] = entity.velocity
+            self.accelerations[row] = entity.acceleration
+            self.dirty[row] = False
+            entity._world, entity._world_row = self, row
+        self._handles_outdated = True
+
+    def remove_entities(self, entities: Iterable[Entity]):
+        """Gives the entities their position, velocity and acceleration back"""
+        for entity in entities:
+            assert entity._world is self
+            row, last = entity._world_row, len(self.entities) - 1
+            entity._position = entity.position
+            entity._velocity = entity.velocity
+            entity._acceleration = entity.acceleration
+            entity._transform_dirty |= bool(self.dirty[row])
+            entity._world, entity._world_row = None, -1
+            # The last row takes the place of the removed one
+            moved = self.entities.pop()
+            if row != last:
+                self.entities[row] = moved
+                moved._world_row = row
+                for array in (
+                    self.positions,
+                    self.velocities,
+                    self.accelerations,
+                    self.dirty,
+                ):
+                    array[row] = array[last]
+        self._handles_outdated = True
+
+    def step(self):
+        """Moves every entity by its velocity, and then accelerates it"""
+        n = len(self.entities)
+        if n == 0:
+            return
+        positions, velocities = self.positions[:n], self.velocities[:n]
+        self.dirty[:n] |= velocities.any(axis=1)
+        positions += velocities
+        velocities += self.accelerations[:n]
+        if self.collision_manager is not None:
+            self._write_bounds()
+
+    def move(self, row: int, vector: Pos):
+        """Moves a single entity, such as when it is teleported"""
+        self.positions[row] += vector
+        self.dirty[row] = True
+        if self.collision_manager is not None:
+            self._write_bounds(row)
+
+    def position(self, row: int) -> Pos:
+        return Pos(*self.positions[row].tolist())
+
+    def velocity(self, row: int) -> Pos:
+        return Pos(*self.velocities[row].tolist())
+
+    def acceleration(self, row: int) -> Pos:
+        return Pos(*self.accelerations[row].tolist())
+
+    def _write_bounds(self, row: int | None = None):
+        """
+        Shifts the bounding boxes of the colliders to the new positions, of
+        every entity or only of the one in row.
+        """
+        assert self.collision_manager is not None
+        store = self.collision_manager.store
+        if self._handles_outdated or self._handles_version != store.handles_version:
+            self._build_handles()
+        if len(self._handles) == 0:
+            return
+        handles, rows, offsets = self._handles, self._handle_rows, self._offsets
+        if row is not None:
+            selected = rows == row
+            handles, rows, offsets = (
+                handles[selected],
+                rows[selected],
+                offsets[selected],
+            )
+        # The offsets are laid out as store.bounds, relative to the entity
+        rects = RectArray(offsets.copy()).translate(Vec2Array(self.positions[rows]))
+        store.bounds[handles] = rects.array
+
+    def _build_handles(self):
+        assert self.collision_manager is not None
+        store = self.collision_manager.store
+        obj_handles, colliders = store.obj_handles, store.colliders
+        handles, rows, offsets = [], [], []
+        for row, entity in enumerate(self.entities):
+            if entity not in obj_handles:
+                continue
+            entity.sync_transform()
+            x, y = entity.position
+            for handle in obj_handles[entity]:
+                collider = colliders[handle]
+                assert collider is not None
+                rect = collider.bounding_rect
+                handles.append(handle)
+                rows.append(row)
+                offsets.append(
+                    (rect.left - x, rect.top - y, rect.right - x, rect.bottom - y)
+                )
+        self._handles = np.array(handles, dtype=np.int64)
+        self._handle_rows = np.array(rows, dtype=np.int64)
+        self._offsets = np.array(offsets, dtype=np.float64).reshape(-1, 4)
+        self._handles_outdated = False
+        self._handles_version = store.handles_version
+
+    def _ensure_capacity(self, size: int):
+        capacity = len(self.positions)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ("positions", "velocities", "accelerations", "dirty"):
+            old = getattr(self, name)
+            array = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            array[: len(old)] = old
+            setattr(self, name, array)
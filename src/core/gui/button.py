@@ -33,6 +33,7 @@ class Button(Entity):
         self.hover_sfc = hover_sfc or idle_sfc
 
     def get_surface(self) -> tuple[Surface, Pos]:
+        self.sync_transform()
         pos = Pos.from_rect(self.collider.bounding_rect)
         if self.is_left_idle():
             return self.idle_sfc, pos
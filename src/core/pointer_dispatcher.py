@@ -0,0 +1,59 @@
+from typing import Iterable
+
+import pygame
+from pygame.event import Event
+
+from .collision import CollisionManager2D
+from .entity import Entity
+from .utils import Pos
+
+POINTER_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION)
+
+
+class PointerDispatcher:
+    """
+    Resolves the entities under the cursor once per frame and once per
+    mouse event with a point query on collision_manager, instead of letting
+    every entity test the cursor against its own colliders. Only the
+    registered entities under the cursor receive hover and button events.
+    Entities left by the cursor are reset to IDLE once, when it leaves.
+    """
+
+    def __init__(self, collision_manager: CollisionManager2D):
+        self.collision_manager = collision_manager
+        self.entities: set[Entity] = set()
+        self.hovered: set[Entity] = set()
+
+    def add_entities(self, entities: Iterable[Entity]):
+        for entity in entities:
+            entity.pointer_managed = True
+            self.entities.add(entity)
+
+    def remove_entities(self, entities: Iterable[Entity]):
+        for entity in entities:
+            entity.pointer_managed = False
+            self.entities.discard(entity)
+            self.hovered.discard(entity)
+
+    def update(self):
+        for entity in self._hover(Pos(*pygame.mouse.get_pos())):
+            entity.handle_pointer_hover()
+
+    def on_event(self, event: Event):
+        if event.type not in POINTER_EVENTS:
+            return
+        pos = Pos(*event.pos) if hasattr(event, "pos") else None
+        for entity in self._hover(pos or Pos(*pygame.mouse.get_pos())):
+            entity.handle_pointer_event(event)
+
+    def _hover(self, pos: Pos) -> set[Entity]:
+        """Updates the hovered entities, resetting the ones left behind"""
+        under_cursor = {
+            obj
+            for obj in self.collision_manager.query_point(pos)
+            if obj in self.entities
+        }
+        for entity in self.hovered - under_cursor:
+            entity.reset_all_mouse_button_states()
+        self.hovered = under_cursor
+        return under_cursor
@@ -0,0 +1,73 @@
+import pygame
+from pygame.surface import Surface
+
+from .utils import Pos
+
+
+class RenderQueue:
+    """
+    Collects the surfaces to draw in a frame, grouped by layer, and draws
+    each layer with a single Surface.blits call, lowest layer first.
+
+    Layers marked as static are composited once into a cached surface
+    covering only the area their contents are drawn on, which is drawn
+    instead of their contents until the layer is invalidated. While the
+    cache is valid, whatever is added to a static layer is ignored.
+    """
+
+    def __init__(self):
+        self._layers: dict[int, list[tuple[Surface, Pos]]] = {}
+        self._static_layers: set[int] = set()
+        self._static_cache: dict[int, tuple[Surface, Pos] | None] = {}
+
+    def mark_static(self, layer: int):
+        self._static_layers.add(layer)
+
+    def invalidate(self, layer: int | None = None):
+        """Rebuilds the cache of a static layer (or all of them) on next flush"""
+        if layer is None:
+            self._static_cache.clear()
+        else:
+            self._static_cache.pop(layer, None)
+
+    def is_cached(self, layer: int) -> bool:
+        """Tells if adding to layer is pointless until it is invalidated"""
+        return layer in self._static_cache
+
+    def add(self, surfaces: list[tuple[Surface, Pos]], layer: int = 0):
+        if self.is_cached(layer):
+            return
+        self._layers.setdefault(layer, []).extend(surfaces)
+
+    def flush(self, screen: Surface):
+        """Draws and empties the queue"""
+        layers = self._layers
+        for layer in sorted(layers.keys() | self._static_cache.keys()):
+            if layer in self._static_layers:
+                if cached := self._cached_layer(layer):
+                    screen.blit(*cached)
+            else:
+                screen.blits(layers[layer], doreturn=False)
+        layers.clear()
+
+    def _cached_layer(self, layer: int) -> tuple[Surface, Pos] | None:
+        """The cached surface of layer and where to draw it, if not empty"""
+        if layer not in self._static_cache:
+            self._static_cache[layer] = self._composite(self._layers.get(layer, []))
+        return self._static_cache[layer]
+
+    @staticmethod
+    def _composite(surfaces: list[tuple[Surface, Pos]]) -> tuple[Surface, Pos] | None:
+        if not surfaces:
+            return None
+        rects = [surface.get_rect(topleft=pos) for surface, pos in surfaces]
+        area = rects[0].unionall(rects[1:])
+        cache = Surface(area.size, pygame.SRCALPHA)
+        cache.blits(
+            [
+                (surface, (pos[0] - area.x, pos[1] - area.y))
+                for surface, pos in surfaces
+            ],
+            doreturn=False,
+        )
+        return cache, Pos(area.x, area.y)
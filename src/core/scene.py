@@ -1,7 +1,13 @@
+from typing import Iterable
+
+import pygame
 from pygame.event import Event
 from pygame.surface import Surface
 
-from .utils import SceneTransitionState
+from .entity import Entity
+from .pointer_dispatcher import PointerDispatcher
+from .render_queue import RenderQueue
+from .utils import Rect, SceneTransitionState
 
 
 class Scene:
@@ -9,16 +15,78 @@ class Scene:
         self.name = name
         self._transition_state = SceneTransitionState.IDLE
         self.next_scene: Scene | str | None = None  # Next scene to be executed
+        # If set, delivers the mouse to the entities registered in it
+        self.pointer_dispatcher: PointerDispatcher | None = None
+        self._needs_full_redraw = True
+        self.render_queue = RenderQueue()
+        # Fraction of a fixed timestep not simulated yet when rendering
+        self.interpolation = 0.0
 
     @property
     def transition_state(self) -> SceneTransitionState:
         return self._transition_state
 
     def update(self):
-        pass
+        if self.pointer_dispatcher is not None:
+            self.pointer_dispatcher.update()
 
     def on_event(self, event: Event):
-        pass
+        if self.pointer_dispatcher is not None:
+            self.pointer_dispatcher.on_event(event)
+
+    def render(self, screen: Surface) -> list[Rect] | None:
+        """
+        Draws the scene. Returns the regions of the screen that changed, or
+        None if the whole screen has to be updated. Scenes can opt into
+        updating only the changed regions by returning render_dirty.
+        """
+        return None
+
+    def queue_entities(self, entities: Iterable[Entity]):
+        """Adds the surfaces of entities to render_queue, on their layers"""
+        queue = self.render_queue
+        for entity in entities:
+            if not queue.is_cached(entity.layer):
+                queue.add(entity.get_surfaces(), entity.layer)
+
+    def invalidate(self):
+        """Makes the next render_dirty redraw the whole screen"""
+        self._needs_full_redraw = True
 
-    def render(self, screen: Surface):
-        pass
+    def render_dirty(
+        self,
+        screen: Surface,
+        entities: Iterable[Entity],
+        background: tuple[int, int, int],
+    ) -> list[Rect]:
+        """
+        Redraws only the regions of the screen where a surface of an entity
+        moved or changed. They are cleared with background and every surface
+        overlapping them is drawn again, in order.
+        """
+        entities = list(entities)
+        if self._needs_full_redraw:
+            self._needs_full_redraw = False
+            screen.fill(background)
+            for entity in entities:
+                entity.pop_dirty_rects()
+                screen.blits(entity.screen_surfaces, doreturn=False)
+            return [Rect(0, 0, screen.get_width(), screen.get_height())]
+        dirty = [rect for entity in entities for rect in entity.pop_dirty_rects()]
+        if not dirty:
+            return dirty
+        for rect in dirty:
+            screen.fill(background, rect)
+        areas = [pygame.Rect(rect) for rect in dirty]
+        for entity in entities:
+            screen.blits(
+                [
+                    surface
+                    for surface, rect in zip(
+                        entity.screen_surfaces, entity.screen_rects
+                    )
+                    if pygame.Rect(rect).collidelist(areas) != -1
+                ],
+                doreturn=False,
+            )
+        return dirty
@@ -1,5 +1,7 @@
 from .auxiliary import insertion_sort
-from .enums import ClickState, MouseButtons, SceneTransitionState
+from .enums import BodyType, ClickState, MouseButtons, SceneTransitionState
 from .fps_tracker import FPSTracker
+from .frame_profiler import FrameProfiler
 from .singleton_metaclass import SingletonMetaclass
 from .tuples import Pos, Rect
+from .vectors import RectArray, Vec2Array
@@ -1,7 +1,16 @@
 from typing import Any, Callable
 
 
-def insertion_sort(arr: list, size: Callable[[Any], int]) -> None:
+def insertion_sort(
+    arr: list,
+    size: Callable[[Any], Any],
+    on_swap: Callable[[Any, Any], None] | None = None,
+) -> None:
+    """
+    Sorts arr in place by size. If on_swap is given, it is called as
+    on_swap(key, other) every time the element key moves to the left
+    of the element other.
+    """
     n = len(arr)  # Get the length of the array
 
     if n <= 1:
@@ -11,8 +20,11 @@ def insertion_sort(arr: list, size: Callable[[Any], int]) -> None:
         key = arr[
             i
         ]  # Store the current element as the key to be inserted in the right position
+        key_size = size(key)
         j = i - 1
-        while j >= 0 and size(key) < size(arr[j]):
+        while j >= 0 and key_size < size(arr[j]):
+            if on_swap is not None:
+                on_swap(key, arr[j])
             # Move elements greater than key one position ahead
             arr[j + 1] = arr[j]  # Shift elements to the right
             j -= 1
@@ -27,3 +27,11 @@ class SceneTransitionState(Enum):
     CLOSE_AND_MOVE_TO_NEW_SCENE = auto()
     MOVE_TO_EXISTING_SCENE = auto()
     MOVE_TO_NEW_SCENE = auto()
+
+
+class BodyType(Enum):
+    """How a collidable takes part in collisions"""
+
+    STATIC = auto()  # Never moves, e.g. level geometry
+    KINEMATIC = auto()  # Moves on its own, but is not pushed by collisions
+    DYNAMIC = auto()  # Moves and reacts to collisions
@@ -0,0 +1,118 @@
+import csv
+import json
+from collections import deque
+from threading import Lock
+from time import perf_counter
+
+import numpy as np
+from pygame.font import Font
+from pygame.surface import Surface
+
+from .singleton_metaclass import SingletonMetaclass
+
+
+class FrameProfiler(metaclass=SingletonMetaclass):
+    """
+    Times named scopes and counts named events in every frame. Each call
+    to end_frame pushes the totals of the frame (milliseconds for scopes,
+    plain numbers for counters) into a ring buffer of the last
+    HISTORY_SIZE frames, which can be summarized, drawn on the screen or
+    exported. While disabled, scope and count do nothing. count can be
+    called from other threads, such as the narrow phase workers.
+
+        profiler = FrameProfiler()
+        with profiler.scope("update"):
+            scene.update()
+        profiler.count("pairs", len(pairs))
+        profiler.end_frame()
+    """
+
+    HISTORY_SIZE = 600
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self):
+        self.enabled = False
+        self.frames: deque[dict[str, float]] = deque(maxlen=self.HISTORY_SIZE)
+        self._current: dict[str, float] = {}
+        self._frame_start = perf_counter()
+        self._null_scope = _NullScope()
+        self._count_lock = Lock()
+
+    def scope(self, name: str) -> "_Scope | _NullScope":
+        if not self.enabled:
+            return self._null_scope
+        return _Scope(self._current, name)
+
+    def count(self, name: str, amount: float = 1):
+        if self.enabled:
+            with self._count_lock:
+                self._current[name] = self._current.get(name, 0) + amount
+
+    def end_frame(self):
+        now = perf_counter()
+        if self.enabled:
+            self._current["frame"] = (now - self._frame_start) * 1000
+            self.frames.append(self._current)
+            self._current = {}
+        self._frame_start = now
+
+    def reset(self):
+        self.frames.clear()
+        self._current = {}
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """The percentiles of every scope and counter over the history"""
+        names = sorted({name for frame in self.frames for name in frame})
+        summary = {}
+        for name in names:
+            values = np.array([frame.get(name, 0) for frame in self.frames])
+            percentiles = np.percentile(values, self.PERCENTILES)
+            summary[name] = {
+                f"p{p}": float(value) for p, value in zip(self.PERCENTILES, percentiles)
+            }
+        return summary
+
+    def render_overlay(self, screen: Surface, font: Font, pos=(10, 10)):
+        x, y = pos
+        for name, percentiles in self.summary().items():
+            values = " ".join(
+                f"{key} {value:.2f}" for key, value in percentiles.items()
+            )
+            text_surface = font.render(f"{name}: {values}", False, (0, 0, 0))
+            screen.blit(text_surface, (x, y))
+            y += text_surface.get_height()
+
+    def export_csv(self, path: str):
+        """One row per frame and one column per scope or counter"""
+        names = sorted({name for frame in self.frames for name in frame})
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=names, restval=0)
+            writer.writeheader()
+            writer.writerows(self.frames)
+
+    def export_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"summary": self.summary(), "frames": list(self.frames)}, f)
+
+
+class _Scope:
+    __slots__ = ("totals", "name", "start")
+
+    def __init__(self, totals: dict[str, float], name: str):
+        self.totals = totals
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+
+    def __exit__(self, *_):
+        elapsed = (perf_counter() - self.start) * 1000
+        self.totals[self.name] = self.totals.get(self.name, 0) + elapsed
+
+
+class _NullScope:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *_):
+        pass
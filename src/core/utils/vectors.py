@@ -0,0 +1,152 @@
+from typing import Sequence
+
+import numpy as np
+
+from .tuples import Pos, Rect
+
+
+class Vec2Array:
+    """
+    The batched version of Pos: N vectors in the rows of an N x 2 float
+    array. Wrapping an array or taking a view of some rows never copies
+    it, so several objects can share the same vectors. The operations
+    change the vectors in place and return self, so they can be chained.
+
+        positions = Vec2Array.from_pos([Pos(0, 0), Pos(1, 2)])
+        positions.add(velocities).scale(2)
+    """
+
+    __slots__ = ("array",)
+
+    def __init__(self, array: np.ndarray):
+        assert array.ndim == 2 and array.shape[1] == 2
+        self.array = array
+
+    @staticmethod
+    def zeros(size: int) -> "Vec2Array":
+        return Vec2Array(np.zeros((size, 2)))
+
+    @staticmethod
+    def from_pos(positions: Sequence[Pos]) -> "Vec2Array":
+        return Vec2Array(np.array(positions, dtype=np.float64).reshape(-1, 2))
+
+    def to_pos(self) -> list[Pos]:
+        return [Pos(x, y) for x, y in self.array.tolist()]
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __getitem__(self, index: int) -> Pos:
+        return Pos(*self.array[index].tolist())
+
+    def __setitem__(self, index: int, pos: Pos):
+        self.array[index] = pos
+
+    def view(self, start: int, stop: int) -> "Vec2Array":
+        """The vectors in rows start to stop, sharing the same array"""
+        return Vec2Array(self.array[start:stop])
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.array[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.array[:, 1]
+
+    def add(self, other: "Vec2Array | Pos") -> "Vec2Array":
+        self.array += _operand(other)
+        return self
+
+    def sub(self, other: "Vec2Array | Pos") -> "Vec2Array":
+        self.array -= _operand(other)
+        return self
+
+    def scale(self, scalar: float | np.ndarray) -> "Vec2Array":
+        """scalar is a number, or an array with one number per vector"""
+        if isinstance(scalar, np.ndarray):
+            scalar = scalar.reshape(-1, 1)
+        self.array *= scalar
+        return self
+
+    def dot(self, other: "Vec2Array | Pos") -> np.ndarray:
+        return (self.array * _operand(other)).sum(axis=1)
+
+
+class RectArray:
+    """
+    The batched version of Rect: N rects in the rows of an N x 4 float
+    array, as (left, top, right, bottom), which is also how ColliderStore
+    keeps the bounding boxes of the colliders. Like Vec2Array, wrapping an
+    array or taking a view never copies it, and translate changes the
+    rects in place.
+    """
+
+    __slots__ = ("array",)
+
+    def __init__(self, array: np.ndarray):
+        assert array.ndim == 2 and array.shape[1] == 4
+        self.array = array
+
+    @staticmethod
+    def zeros(size: int) -> "RectArray":
+        return RectArray(np.zeros((size, 4)))
+
+    @staticmethod
+    def from_rects(rects: Sequence[Rect]) -> "RectArray":
+        rect_array = RectArray.zeros(len(rects))
+        rect_array.set_rects(rects)
+        return rect_array
+
+    def set_rects(self, rects: Sequence[Rect]):
+        """Overwrites the rects with the given ones, as many as there are"""
+        xywh = np.array(rects, dtype=np.float64).reshape(-1, 4)
+        assert len(xywh) == len(self.array)
+        self.array[:, 0:2] = xywh[:, 0:2]
+        np.add(xywh[:, 0:2], xywh[:, 2:4], out=self.array[:, 2:4])
+
+    def to_rects(self) -> list[Rect]:
+        return [
+            Rect(left, top, right - left, bottom - top)
+            for left, top, right, bottom in self.array.tolist()
+        ]
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __getitem__(self, index: int) -> Rect:
+        left, top, right, bottom = self.array[index].tolist()
+        return Rect(left, top, right - left, bottom - top)
+
+    def __setitem__(self, index: int, rect: Rect):
+        self.array[index] = (rect.left, rect.top, rect.right, rect.bottom)
+
+    def view(self, start: int, stop: int) -> "RectArray":
+        """The rects in rows start to stop, sharing the same array"""
+        return RectArray(self.array[start:stop])
+
+    @property
+    def top_left(self) -> Vec2Array:
+        return Vec2Array(self.array[:, 0:2])
+
+    @property
+    def bottom_right(self) -> Vec2Array:
+        return Vec2Array(self.array[:, 2:4])
+
+    @property
+    def widths(self) -> np.ndarray:
+        return self.array[:, 2] - self.array[:, 0]
+
+    @property
+    def heights(self) -> np.ndarray:
+        return self.array[:, 3] - self.array[:, 1]
+
+    def translate(self, vector: Vec2Array | Pos) -> "RectArray":
+        """Moves every rect by vector, or each one by its own vector"""
+        self.top_left.add(vector)
+        self.bottom_right.add(vector)
+        return self
+
+
+def _operand(other: Vec2Array | Pos) -> np.ndarray | Pos:
+    return other.array if isinstance(other, Vec2Array) else other
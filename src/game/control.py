@@ -1,35 +1,103 @@
+from time import perf_counter
+
 import pygame
 
 from src.core import Scene
-from src.core.utils import SceneTransitionState
+from src.core.utils import FrameProfiler, Rect, SceneTransitionState
 
 from .singletons import GameSettings
 
 
 class Control:
-    def __init__(self, initial_scene: Scene) -> None:
+    """
+    Runs the game loop. By default, every frame runs one update and one
+    render, so the simulation slows down when rendering is slow.
+
+    With fixed_timestep, update always advances the simulation by 1 / fps
+    seconds and runs as many times as needed to keep up with real time,
+    at most MAX_CATCH_UP_STEPS times per render. Renders only happen once
+    the simulation advanced, and the scene gets the fraction of a step not
+    simulated yet in scene.interpolation.
+    """
+
+    MAX_CATCH_UP_STEPS = 5
+
+    def __init__(self, initial_scene: Scene, fixed_timestep: bool = False) -> None:
         settings = GameSettings()
         screen_resolution = (settings.screen_width, settings.screen_height)
         self.screen = pygame.display.set_mode(screen_resolution)
         self.clock = pygame.time.Clock()
         self.active_scene = initial_scene
         self.scene_dict = {initial_scene.name: initial_scene}
+        self.fixed_timestep = fixed_timestep
+        self.profiler = FrameProfiler()
 
     def main_loop(self):
+        if self.fixed_timestep:
+            self.fixed_timestep_loop()
+        dirty_rects: list[Rect] | None = None
+        profiler = self.profiler
         while True:
-            pygame.display.update()
-            self.active_scene.update()
-            self.clock.tick(GameSettings().fps)
-            self.active_scene.render(self.screen)
+            self.update_display(dirty_rects)
+            with profiler.scope("update"):
+                self.active_scene.update()
+            with profiler.scope("idle"):
+                self.clock.tick(GameSettings().fps)
+            with profiler.scope("render"):
+                dirty_rects = self.active_scene.render(self.screen)
+            self.handle_events()
+            self.handle_scene_transition()
+            profiler.end_frame()
+
+    def fixed_timestep_loop(self):
+        step = 1 / GameSettings().fps
+        accumulator = 0.0
+        previous_time = perf_counter()
+        profiler = self.profiler
+        while True:
+            current_time = perf_counter()
+            accumulator += current_time - previous_time
+            previous_time = current_time
+            self.handle_events()
+            steps = 0
+            while accumulator >= step and steps < self.MAX_CATCH_UP_STEPS:
+                with profiler.scope("update"):
+                    self.active_scene.update()
+                accumulator -= step
+                steps += 1
+            profiler.count("steps", steps)
+            if accumulator >= step:
+                # Too far behind, the remaining steps are dropped
+                accumulator %= step
+            if steps == 0:
+                with profiler.scope("idle"):
+                    pygame.time.wait(int((step - accumulator) * 1000))
+                continue
+            self.active_scene.interpolation = accumulator / step
+            with profiler.scope("render"):
+                dirty_rects = self.active_scene.render(self.screen)
+            self.update_display(dirty_rects)
+            self.handle_scene_transition()
+            profiler.end_frame()
+
+    def update_display(self, dirty_rects: list[Rect] | None):
+        with self.profiler.scope("display"):
+            if dirty_rects is None:
+                pygame.display.update()
+            else:
+                pygame.display.update(dirty_rects)
+
+    def handle_events(self):
+        with self.profiler.scope("events"):
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     exit()
                 self.active_scene.on_event(event)
-            self.handle_scene_transition()
 
     def set_active_scene(self, scene: Scene):
         self.active_scene = scene
+        scene.invalidate()
 
     def handle_scene_transition(self):
         scene = self.active_scene
@@ -50,3 +118,6 @@ class Control:
                 assert isinstance(scene.next_scene, Scene)
                 self.active_scene = scene.next_scene
                 self.scene_dict[self.active_scene.name] = self.active_scene
+        if self.active_scene is not scene:
+            # The screen still shows the previous scene
+            self.active_scene.invalidate()
@@ -0,0 +1,167 @@
+"""
+Headless benchmark of a scene full of moving colliders. Runs with SDL's
+dummy video driver and no frame rate cap, so it also works with no display.
+Run with: python -m test.benchmark --frames 600 --count 500 --polygons 0.5
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+from math import cos, pi, sin
+from random import Random
+from typing import get_args
+
+import pygame
+from pygame.surface import Surface
+
+from src.core import Scene
+from src.core.collision import Collider, CollisionManager2D
+from src.core.collision.colliders import PolygonCollider, RectCollider
+from src.core.collision.collision_manager import BroadPhaseType
+from src.core.gui import Button
+from src.core.utils import FrameProfiler, Pos, Rect
+from src.game.singletons import GameSettings
+
+
+class BenchmarkScene(Scene):
+    """
+    count buttons of random sizes within size_range, moving with random
+    velocities within speed_range pixels per frame and bouncing on the
+    borders of the screen. A fraction polygon_ratio of them are convex
+    polygons with 3 to 8 vertices, and the rest are rects.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        count: int = 350,
+        size_range: tuple[int, int] = (10, 20),
+        speed_range: tuple[int, int] = (-5, 5),
+        polygon_ratio: float = 0.0,
+        broad_phase: BroadPhaseType = "sap",
+    ):
+        super().__init__("BENCHMARK")
+        rng = Random(seed)
+        self.width = GameSettings().screen_width
+        self.height = GameSettings().screen_height
+        self.buttons: list[Button] = []
+        for _ in range(count):
+            width, height = rng.randint(*size_range), rng.randint(*size_range)
+            x = rng.randint(0, self.width - width)
+            y = rng.randint(0, self.height - height)
+            surface = Surface((width, height), pygame.SRCALPHA)
+            if rng.random() < polygon_ratio:
+                points = random_polygon(rng, width, height)
+                collider: Collider = PolygonCollider(points)
+                pygame.draw.polygon(surface, (0, 0, 0), points)
+            else:
+                collider = RectCollider(Rect(0, 0, width, height))
+                surface.fill((0, 0, 0))
+            button = Button(Pos(x, y), GameSettings().fps, collider, surface)
+            button.set_velocity_in_frames(
+                Pos(rng.randint(*speed_range), rng.randint(*speed_range))
+            )
+            self.buttons.append(button)
+        self.collision_manager = CollisionManager2D(broad_phase)
+        self.collision_manager.add_collidables(frozenset(self.buttons))
+        self.collisions = 0
+
+    def update(self):
+        super().update()
+        for button in self.buttons:
+            button.update()
+            self.handle_button_reflections(button)
+        self.collision_manager.update()
+        self.collisions = len(self.collision_manager.get_collisions())
+
+    def render(self, screen):
+        super().render(screen)
+        screen.fill((255, 255, 255))
+        self.queue_entities(self.buttons)
+        self.render_queue.flush(screen)
+
+    def handle_button_reflections(self, button: Button):
+        button.sync_transform()
+        rect = button.collider.bounding_rect
+        velocity = button.velocity
+        if rect.left < 0:
+            velocity = Pos(abs(velocity.x), velocity.y)
+        elif rect.right > self.width:
+            velocity = Pos(-abs(velocity.x), velocity.y)
+        if rect.top < 0:
+            velocity = Pos(velocity.x, abs(velocity.y))
+        elif rect.bottom > self.height:
+            velocity = Pos(velocity.x, -abs(velocity.y))
+        button.set_velocity_in_frames(velocity)
+
+
+def random_polygon(rng: Random, width: int, height: int) -> list[Pos]:
+    """A convex polygon inscribed in the ellipse of the rect (0, 0, w, h)"""
+    n_vertices = rng.randint(3, 8)
+    angles = sorted(rng.uniform(0, 2 * pi) for _ in range(n_vertices))
+    return [Pos(width / 2 * (1 + cos(a)), height / 2 * (1 + sin(a))) for a in angles]
+
+
+def run_benchmark(scene: Scene, frames: int, warmup: int = 10) -> FrameProfiler:
+    """Updates and renders scene as fast as possible and profiles each frame"""
+    screen = pygame.display.get_surface()
+    profiler = FrameProfiler()
+    profiler.enabled = False
+    for _ in range(warmup):
+        scene.update()
+        scene.render(screen)
+    profiler.reset()
+    profiler.enabled = True
+    profiler.end_frame()
+    for _ in range(frames):
+        with profiler.scope("update"):
+            scene.update()
+        with profiler.scope("render"):
+            scene.render(screen)
+        profiler.end_frame()
+    profiler.enabled = False
+    return profiler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--count", type=int, default=350)
+    parser.add_argument("--size", type=int, nargs=2, default=(10, 20))
+    parser.add_argument("--speed", type=int, nargs=2, default=(-5, 5))
+    parser.add_argument("--polygons", type=float, default=0.0)
+    parser.add_argument(
+        "--broad-phase",
+        default="sap",
+        choices=get_args(BroadPhaseType),
+    )
+    parser.add_argument("--json", help="Writes the summary and frames to this file")
+    parser.add_argument("--csv", help="Writes the frames to this file")
+    args = parser.parse_args()
+
+    pygame.init()
+    settings = GameSettings()
+    pygame.display.set_mode((settings.screen_width, settings.screen_height))
+    scene = BenchmarkScene(
+        seed=args.seed,
+        count=args.count,
+        size_range=tuple(args.size),
+        speed_range=tuple(args.speed),
+        polygon_ratio=args.polygons,
+        broad_phase=args.broad_phase,
+    )
+    profiler = run_benchmark(scene, args.frames)
+    print(json.dumps(profiler.summary(), indent=4))
+    if args.json:
+        profiler.export_json(args.json)
+    if args.csv:
+        profiler.export_csv(args.csv)
+
+
+if __name__ == "__main__":
+    main()
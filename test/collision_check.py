@@ -0,0 +1,161 @@
+"""
+Checks every broad phase backend, and the batched and threaded GJK, against
+brute force: a seeded scene of moving rects and polygons, with static
+bodies, collision filters, adds and removes, where each frame the pairs
+reported by get_collisions must be the pairs of colliders that collide.
+Run with: python -m test.collision_check --frames 200 --count 150
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import sys
+from itertools import combinations
+from math import cos, pi, sin
+from random import Random
+from typing import get_args
+
+import pygame
+from pygame.surface import Surface
+
+from src.core.collision import Collider, CollisionDetector, CollisionManager2D
+from src.core.collision.colliders import PolygonCollider, RectCollider
+from src.core.collision.collision_manager import BroadPhaseType
+from src.core.gui import Button
+from src.core.utils import BodyType, Pos, Rect
+
+from .benchmark import random_polygon
+
+WORLD_SIZE = 400
+CATEGORIES = (1, 2, 4)
+
+
+def random_button(rng: Random) -> Button:
+    """A rect, a small polygon, or a polygon too large for SAT"""
+    width, height = rng.randint(8, 30), rng.randint(8, 30)
+    kind = rng.random()
+    if kind < 0.4:
+        collider: Collider = RectCollider(Rect(0, 0, width, height))
+    elif kind < 0.8:
+        collider = PolygonCollider(random_polygon(rng, width, height))
+    else:
+        n_vertices = rng.randint(12, 24)
+        collider = PolygonCollider(
+            [
+                Pos(width / 2 * (1 + cos(a)), height / 2 * (1 + sin(a)))
+                for a in (2 * pi * i / n_vertices for i in range(n_vertices))
+            ]
+        )
+    position = Pos(rng.uniform(0, WORLD_SIZE), rng.uniform(0, WORLD_SIZE))
+    button = Button(position, 60, collider, Surface((width, height)))
+    button.set_velocity_in_frames(Pos(rng.uniform(-4, 4), rng.uniform(-4, 4)))
+    return button
+
+
+def brute_force(buttons: list[Button]) -> set[frozenset[Button]]:
+    """Pairs of buttons that collide, tested all against all"""
+    found = set()
+    for button_1, button_2 in combinations(buttons, 2):
+        if not (
+            button_1.collision_category & button_2.collision_mask
+            and button_2.collision_category & button_1.collision_mask
+        ):
+            continue
+        if BodyType.DYNAMIC not in (button_1.body_type, button_2.body_type):
+            continue
+        for collider_1 in button_1.get_colliders():
+            for collider_2 in button_2.get_colliders():
+                if CollisionDetector.collide(collider_1, collider_2) is not None:
+                    found.add(frozenset((button_1, button_2)))
+    return found
+
+
+def managers() -> dict[str, CollisionManager2D]:
+    configs = {name: CollisionManager2D(name) for name in get_args(BroadPhaseType)}
+    batched = CollisionManager2D()
+    batched.BATCHED_GJK_MIN_PAIRS = 0
+    configs["batched_gjk"] = batched
+    threaded = CollisionManager2D(narrow_phase_workers=2, parallel_min_pairs=1)
+    threaded.BATCHED_GJK_MIN_PAIRS = 0
+    configs["threaded_gjk"] = threaded
+    return configs
+
+
+def run(seed: int, frames: int, count: int) -> int:
+    """Returns the number of frames on which some configuration was wrong"""
+    rng = Random(seed)
+    buttons = [random_button(rng) for _ in range(count)]
+    configs = managers()
+    for manager in configs.values():
+        manager.add_collidables(buttons)
+    for button in buttons[: count // 10]:
+        button.set_velocity_in_frames(Pos(0, 0))
+        for manager in configs.values():
+            manager.set_body_type(button, BodyType.STATIC)
+    wrong_frames = 0
+    for frame in range(frames):
+        for button in buttons:
+            if button.body_type == BodyType.STATIC:
+                continue
+            button.update()
+            x, y = button.position
+            if not 0 <= x <= WORLD_SIZE or not 0 <= y <= WORLD_SIZE:
+                button.set_velocity_in_frames(Pos.inv(button.velocity))
+        if frame % 20 == 5:
+            added = [random_button(rng) for _ in range(rng.randint(1, 10))]
+            removed = rng.sample(buttons, rng.randint(1, 10))
+            buttons = [button for button in buttons if button not in removed]
+            buttons += added
+            for manager in configs.values():
+                manager.remove_collidables(removed)
+                manager.add_collidables(added)
+        if frame % 20 == 10:
+            button = rng.choice(buttons)
+            category, mask = rng.choice(CATEGORIES), rng.choice((-1, 1, 6))
+            for manager in configs.values():
+                manager.set_collision_filter(button, category, mask)
+        if frame % 40 == 15:
+            button = rng.choice(buttons)
+            button.set_velocity_in_frames(Pos(0, 0))
+            body_type = rng.choice((BodyType.STATIC, BodyType.DYNAMIC))
+            for manager in configs.values():
+                manager.set_body_type(button, body_type)
+        expected = brute_force(buttons)
+        wrong = []
+        for name, manager in configs.items():
+            manager.update()
+            found = {
+                frozenset((collision.obj_1, collision.obj_2))
+                for collision in manager.get_collisions()
+            }
+            if found != expected:
+                wrong.append(
+                    f"{name} (+{len(found - expected)} -{len(expected - found)})"
+                )
+        if wrong:
+            wrong_frames += 1
+            print(f"frame {frame}: {', '.join(wrong)}")
+    for manager in configs.values():
+        manager.close()
+    return wrong_frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--count", type=int, default=150)
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((WORLD_SIZE, WORLD_SIZE))
+    wrong_frames = run(args.seed, args.frames, args.count)
+    print(f"{wrong_frames} of {args.frames} frames differ from brute force")
+    sys.exit(1 if wrong_frames else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ from random import randint
 import pygame
 from pygame.surface import Surface
 
-from src.core import Entity, Scene
+from src.core import Entity, PointerDispatcher, Scene
 from src.core.collision import Collidable, CollisionManager2D
 from src.core.collision.colliders import PolygonCollider, RectCollider
 from src.core.gui import Button
@@ -33,10 +33,12 @@ class CollisionTestScene(Scene):
                 RectCollider(Rect(0, 0, width, height)),
                 idle_sfc,
             )
-            button.set_velocity_in_seconds(velocity)
+            button.set_velocity_in_frames(velocity)
             self.buttons.add(button)
         self.collision_manager = CollisionManager2D()
         self.collision_manager.add_collidables(frozenset(self.buttons))
+        self.pointer_dispatcher = PointerDispatcher(self.collision_manager)
+        self.pointer_dispatcher.add_entities(self.buttons)
 
     def update(self):
         super().update()
@@ -45,35 +47,24 @@ class CollisionTestScene(Scene):
             button.update()
             self.handle_button_reflections(button)
         self.collision_manager.update()
-        collisions = self.collision_manager.get_collisions()
-        for button in self.buttons:
-            sfc, _ = button.get_surface()
-            sfc.fill((0, 0, 0))
-        for collision in collisions:
-            obj_1 = collision.obj_1
-            obj_2 = collision.obj_2
-            assert isinstance(obj_1, Button)
-            assert isinstance(obj_2, Button)
-            sfc_1, _ = obj_1.get_surface()
-            sfc_2, _ = obj_2.get_surface()
-            sfc_1.fill((255, 0, 0))
-            sfc_2.fill((255, 0, 0))
-
-    def on_event(self, event: pygame.Event):
-        super().on_event(event)
-        for button in self.buttons:
-            button.on_event(event)
+        events = self.collision_manager.get_collision_events()
+        colliding = {c.obj_1 for c in events.began | events.stayed}
+        colliding |= {c.obj_2 for c in events.began | events.stayed}
+        for collision in events.ended:
+            for obj in (collision.obj_1, collision.obj_2):
+                if obj not in colliding:
+                    assert isinstance(obj, Button)
+                    obj.idle_sfc.fill((0, 0, 0))
+        for collision in events.began:
+            for obj in (collision.obj_1, collision.obj_2):
+                assert isinstance(obj, Button)
+                obj.idle_sfc.fill((255, 0, 0))
 
     def render(self, screen):
         super().render(screen)
         screen.fill((255, 255, 255))
-        for button in self.buttons:
-            sfc, pos = button.get_surface()
-            screen.blit(sfc, pos)
-            # collider = list(button.get_colliders())[0]
-            # assert isinstance(collider, RectCollider)
-            # pygame.draw.rect(screen, (0, 255, 0), collider.bounding_rect, width=10)
-            # pygame.draw.rect(screen, (0, 0, 255), collider.rect, width=10)
+        self.queue_entities(self.buttons)
+        self.render_queue.flush(screen)
         pygame.draw.rect(screen, (255, 255, 255), (5, 5, 160, 50))
         text_surface = self.font.render(
             f"FPS: {round(self.fps_tracker.fps, 2)}", False, (0, 0, 0)
@@ -81,6 +72,7 @@ class CollisionTestScene(Scene):
         screen.blit(text_surface, (10, 10))
 
     def handle_button_reflections(self, button: Button):
+        button.sync_transform()
         rect = button.collider.bounding_rect
         screen_width = GameSettings().screen_width
         screen_height = GameSettings().screen_height
@@ -0,0 +1,52 @@
+"""
+Compares gjk_algorithm_2d with scalar_gjk_algorithm_2d on random convex
+polygons of increasing size, to find where the NumPy version catches up.
+Run with: python -m test.gjk_benchmark
+"""
+
+from math import cos, pi, sin
+from random import Random
+from timeit import timeit
+
+from numpy import array
+
+from src.core.collision.collision_detection import (
+    gjk_algorithm_2d,
+    scalar_gjk_algorithm_2d,
+)
+from src.core.utils import Pos
+
+PAIRS = 200
+REPEATS = 20
+
+
+def random_polygon(rng: Random, n_vertices: int) -> list[Pos]:
+    cx, cy, radius = rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(10, 40)
+    angles = sorted(rng.uniform(0, 2 * pi) for _ in range(n_vertices))
+    return [Pos(cx + radius * cos(a), cy + radius * sin(a)) for a in angles]
+
+
+def main():
+    rng = Random(0)
+    print(f"{'vertices':>8} {'numpy (us)':>11} {'scalar (us)':>12}")
+    for n_vertices in (3, 4, 6, 8, 12, 16, 24, 32, 48, 64):
+        pairs = [
+            (random_polygon(rng, n_vertices), random_polygon(rng, n_vertices))
+            for _ in range(PAIRS)
+        ]
+        arrays = [(array(p1), array(p2)) for p1, p2 in pairs]
+        numpy_time = timeit(
+            lambda: [gjk_algorithm_2d(p1, p2) for p1, p2 in arrays], number=REPEATS
+        )
+        scalar_time = timeit(
+            lambda: [scalar_gjk_algorithm_2d(p1, p2) for p1, p2 in pairs],
+            number=REPEATS,
+        )
+        scale = 1e6 / (PAIRS * REPEATS)
+        print(
+            f"{n_vertices:>8} {numpy_time * scale:>11.2f} {scalar_time * scale:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -95,6 +95,7 @@ class GJKTestScene(Scene):
         screen.blit(text_surface, (10, 10))
 
     def handle_button_reflections(self, button: Button):
+        button.sync_transform()
         rect = button.collider.bounding_rect
         screen_width = GameSettings().screen_width
         screen_height = GameSettings().screen_height
@@ -38,9 +38,8 @@ class TestScene(Scene):
         button.on_event(event)
         if button.is_right_double_pressed():
             self.color = (0, 0, 0) if self.color == (255, 255, 255) else (255, 255, 255)
+            self.invalidate()
 
     def render(self, screen):
         super().render(screen)
-        screen.fill(self.color)
-        sfc, pos = button.get_surface()
-        screen.blit(sfc, pos)
+        return self.render_dirty(screen, [button], self.color)